@@ -0,0 +1,224 @@
+"""Пакетное распределение вопросов из командной строки, без окна PyQt5.
+
+Пример:
+    python batch_split.py exams/*.docx --persons persons.txt --mode random --seed 42 -o results
+
+Файлы обрабатываются параллельно в нескольких процессах (--workers):
+разбор и генерация DOCX в python-docx полностью загружают процессор.
+С -o - результаты в TXT пишутся в stdout по очереди, сообщения - в stderr.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+import dedup
+import question_cache
+import question_loader
+import question_store
+import result_export
+import split_engine
+import split_record
+
+
+def expand_inputs(patterns):
+    """Раскрывает шаблоны вида *.docx; порядок и повторы как в аргументах"""
+    paths = {}
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            paths.setdefault(path, None)
+    return list(paths)
+
+
+def output_path_for(input_path, output_dir, file_format=None):
+    """Путь результатов; без file_format - папка для файлов по людям"""
+    if output_dir == result_export.STDOUT_PATH:
+        return result_export.STDOUT_PATH
+    file_name = os.path.splitext(os.path.basename(input_path))[0]
+    suffix = f".{file_format}" if file_format else ""
+    return os.path.join(output_dir, f"{file_name}_results{suffix}")
+
+
+def split_file(input_path, persons, output_dir, mode='even', seed=None, file_format='docx',
+               use_cache=True, limits=None, group_duplicates=False, write_record=False,
+               shard=False):
+    """Загрузка -> распределение -> сохранение одного файла.
+
+    limits - (веса, минимумы, максимумы) для режима weighted;
+    group_duplicates - каждая группа повторов достаётся одному человеку;
+    write_record - рядом с результатами сохраняется запись распределения;
+    shard - вместо одного файла папка с файлом на каждого человека.
+    Возвращает (путь сохранённого файла или папки, количество вопросов).
+    """
+    if use_cache:
+        questions, _ = question_cache.load_questions_cached(input_path)
+    else:
+        questions = question_store.load_question_store(input_path)
+
+    question_set_hash = split_record.questions_hash(questions)
+    units = None
+    if group_duplicates:
+        if use_cache:
+            clusters, _ = question_cache.find_duplicates_cached(questions, question_set_hash)
+        else:
+            clusters = dedup.find_duplicate_clusters(questions)
+        units = dedup.question_units(len(questions), clusters)
+    distribution, record = split_record.split_reproducible(mode, questions, persons, seed, limits,
+                                                           units=units,
+                                                           question_set_hash=question_set_hash)
+
+    if shard:
+        save_path = output_path_for(input_path, output_dir)
+        result_export.save_sharded(distribution.as_dict(), save_path, file_format,
+                                   numbers=distribution.numbers)
+    else:
+        save_path = output_path_for(input_path, output_dir, file_format)
+        save_path = result_export.save_results(distribution.as_dict(), save_path, file_format,
+                                               distribution.numbers)
+    if write_record:
+        record.save(output_path_for(input_path, output_dir, split_record.RECORD_SUFFIX[1:]))
+    return save_path, len(questions)
+
+
+def _split_file_job(job):
+    """Выполняется в процессе пула: ошибки возвращаются, а не выбрасываются,
+    чтобы один плохой файл не прерывал весь пакет"""
+    input_path = job[0]
+    try:
+        save_path, count = split_file(*job)
+    except Exception as e:
+        return input_path, None, 0, str(e)
+    return input_path, save_path, count, None
+
+
+def run_batch(inputs, persons, output_dir, mode='even', seed=None, file_format='docx', workers=None,
+              use_cache=True, limits=None, group_duplicates=False, write_record=False,
+              shard=False):
+    """Обрабатывает файлы и возвращает результаты в порядке входных файлов.
+
+    Каждый результат - (input_path, save_path, count, error). При workers=1
+    всё выполняется в текущем процессе.
+    """
+    jobs = [(input_path, persons, output_dir, mode, seed, file_format, use_cache, limits,
+             group_duplicates, write_record, shard)
+            for input_path in inputs]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs)))
+
+    if workers == 1:
+        return [_split_file_job(job) for job in jobs]
+
+    # multiprocessing и concurrent.futures нужны только для нескольких процессов
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_split_file_job, jobs))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description='Распределение вопросов из TXT/DOCX файлов без графического интерфейса')
+    parser.add_argument('inputs', nargs='+',
+                        help='файлы с вопросами или шаблоны (например, "exams/*.docx")')
+    parser.add_argument('-p', '--persons', required=True,
+                        help='TXT файл со списком людей, по одному в строке: '
+                             '«Имя» или «Имя;вес;минимум;максимум»')
+    parser.add_argument('-m', '--mode', choices=split_engine.SPLIT_MODES,
+                        default='even',
+                        help='равномерное (even), случайное (random), по сложности вопросов '
+                             '(cost) или по весам и границам из файла людей (weighted)')
+    parser.add_argument('-s', '--seed', type=int, default=None,
+                        help='seed для воспроизводимого случайного распределения: результат '
+                             'зависит только от seed, вопросов и списка людей')
+    parser.add_argument('-o', '--output-dir', default='.',
+                        help='папка для результатов (по умолчанию текущая); '
+                             '«-» - TXT в stdout для конвейеров')
+    parser.add_argument('-f', '--format', choices=result_export.EXPORT_FORMATS, default='docx',
+                        help='формат результатов: csv и jsonl - строки «человек, номер, вопрос» '
+                             'для других программ, .gz - со сжатием gzip')
+    parser.add_argument('--shard', action='store_true',
+                        help='писать по файлу на человека (параллельно) в папку '
+                             '<имя>_results; любой формат, кроме docx')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='количество процессов (по умолчанию по числу ядер)')
+    parser.add_argument('-d', '--group-duplicates', action='store_true',
+                        help='находить повторы и почти одинаковые вопросы и отдавать '
+                             'каждую группу одному человеку')
+    parser.add_argument('-r', '--record', action='store_true',
+                        help='сохранять рядом с результатами запись распределения (.qsplit), '
+                             'по которой его можно восстановить')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='не использовать кэш разобранных файлов')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    try:
+        persons, *limits = question_loader.load_persons_limits(args.persons)
+    except ValueError as e:
+        print(f'Ошибка: {e}', file=sys.stderr)
+        return 2
+    if not persons:
+        print(f'Ошибка: в файле {args.persons} нет ни одного имени', file=sys.stderr)
+        return 2
+
+    inputs = expand_inputs(args.inputs)
+    if not inputs:
+        print('Ошибка: не найдено ни одного файла с вопросами', file=sys.stderr)
+        return 2
+
+    if args.shard and args.format == 'docx':
+        print('Ошибка: --shard пишет только txt, csv или jsonl (-f)', file=sys.stderr)
+        return 2
+
+    to_stdout = args.output_dir == result_export.STDOUT_PATH
+    if to_stdout:
+        if args.record or args.shard:
+            print('Ошибка: --record и --shard нельзя использовать при выводе в stdout',
+                  file=sys.stderr)
+            return 2
+        # Несколько процессов перемешали бы результаты в stdout
+        args.workers = 1
+        if args.format == 'docx':
+            args.format = 'txt'
+        elif args.format.endswith('.gz'):
+            args.format = args.format[:-3]
+    else:
+        os.makedirs(args.output_dir, exist_ok=True)
+    log_stream = sys.stderr if to_stdout else sys.stdout
+
+    processed_files = 0
+    total_questions = 0
+    failed = 0
+    start = time.perf_counter()
+
+    results = run_batch(inputs, persons, args.output_dir, args.mode, args.seed,
+                        args.format, args.workers, not args.no_cache, limits,
+                        args.group_duplicates, args.record, args.shard)
+
+    for input_path, save_path, count, error in results:
+        if error is not None:
+            failed += 1
+            print(f'{input_path}: ошибка: {error}', file=sys.stderr)
+            continue
+
+        processed_files += 1
+        total_questions += count
+        print(f'{input_path}: {count} вопросов -> {save_path}', file=log_stream)
+
+    elapsed = time.perf_counter() - start
+    rate_base = elapsed if elapsed > 0 else float('inf')
+    print(f'Обработано файлов: {processed_files} из {len(inputs)}, вопросов: {total_questions}, '
+          f'время: {elapsed:.2f} с ({processed_files / rate_base:.1f} файлов/с, '
+          f'{total_questions / rate_base:.0f} вопросов/с)', file=log_stream)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,320 @@
+"""Замеры скорости загрузки, распределения, отображения и сохранения.
+
+Генерирует синтетические банки вопросов заданных размеров, по очереди
+замеряет каждый этап и пишет результаты в JSON, чтобы сравнивать версии:
+
+    python benchmark.py --questions 1000,100000 --persons 2,1000 -o bench.json
+
+Без аргументов прогоняются банки от 1 тыс. до 1 млн вопросов.
+
+Отображение (display_results) замеряется в окне на платформе Qt offscreen,
+если установлен PyQt5; сохранение в DOCX - если установлен python-docx.
+
+С --startup вместо этапов замеряется холодный запуск в отдельных процессах
+(импорт пакетного режима и показ окна) и сверяется с STARTUP_BUDGET_SECONDS;
+при превышении бюджета или раннем импорте тяжёлых модулей код возврата 1.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import subprocess
+import zipfile
+from importlib.util import find_spec
+
+import question_loader
+import result_export
+import split_engine
+from question_store import QuestionStore
+from result_export import escape
+
+
+DEFAULT_QUESTIONS = (1000, 10000, 100000, 1000000)
+DEFAULT_PERSONS = (2, 30, 1000)
+
+# Медиана от запуска интерпретатора до готовности (без распаковки сборки PyInstaller)
+STARTUP_BUDGET_SECONDS = {'headless': 0.5, 'gui': 2.0}
+STARTUP_RUNS = 5
+# Модули, которые не должны загружаться до первого сохранения в DOCX
+# или запуска нескольких процессов
+LAZY_MODULES = ('docx', 'lxml', 'concurrent.futures.process')
+
+_STARTUP_SCRIPTS = {
+    'headless': 'import batch_split\n',
+    'gui': ("import os, sys\n"
+            "os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')\n"
+            "from PyQt5.QtWidgets import QApplication\n"
+            "import question_splitter\n"
+            "app = QApplication(sys.argv[:1])\n"
+            "window = question_splitter.QuestionSplitterApp()\n"
+            "window.show()\n"
+            "app.processEvents()\n"),
+}
+_STARTUP_EPILOGUE = (
+    "import os, sys\n"
+    f"print('LOADED:' + ','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))\n"
+    "sys.stdout.flush()\n"
+    "os._exit(0)\n"
+)
+
+_WORDS = ('вопрос', 'функция', 'производная', 'интеграл', 'матрица', 'вектор', 'предел',
+          'ряд', 'теорема', 'доказательство', 'определение', 'свойство', 'пример',
+          'уравнение', 'система', 'множество', 'граф', 'алгоритм', 'сложность', 'память')
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+    'relationships/officeDocument" Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+
+def generate_questions(count, seed=0):
+    """Вопросы вида «N. слова...» разной длины, одинаковые при одном seed"""
+    rng = random.Random(seed)
+    return [f"{i}. " + ' '.join(rng.choices(_WORDS, k=rng.randint(4, 40))) + '?'
+            for i in range(1, count + 1)]
+
+
+def write_txt_bank(questions, file_path):
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for question in questions:
+            f.write(question)
+            f.write('\n')
+
+
+def write_docx_bank(questions, file_path):
+    """Минимальный DOCX (без python-docx): по абзацу на вопрос"""
+    with zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', _DOCX_CONTENT_TYPES)
+        archive.writestr('_rels/.rels', _DOCX_RELS)
+        with archive.open('word/document.xml', 'w') as f:
+            f.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    b'<w:document xmlns:w="http://schemas.openxmlformats.org/'
+                    b'wordprocessingml/2006/main"><w:body>')
+            for question in questions:
+                f.write(f'<w:p><w:r><w:t>{escape(question)}</w:t></w:r></w:p>'.encode('utf-8'))
+            f.write(b'<w:sectPr/></w:body></w:document>')
+
+
+def measure(fn, track_memory=True):
+    """Время выполнения fn() и (отдельным прогоном) пик памяти по tracemalloc"""
+    gc.collect()
+    start = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - start
+
+    peak = None
+    if track_memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return seconds, peak
+
+
+def _offscreen_window():
+    """Окно приложения на платформе offscreen или None без PyQt5"""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    try:
+        from PyQt5.QtWidgets import QApplication
+    except ImportError:
+        return None, None
+
+    import question_splitter
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    window = question_splitter.QuestionSplitterApp()
+    window.show()
+    return app, window
+
+
+def run_benchmarks(question_counts, person_counts, work_dir, track_memory=True, log=None):
+    results = []
+    app, window = _offscreen_window()
+
+    def record(stage, questions, persons, fn):
+        seconds, peak = measure(fn, track_memory)
+        results.append({
+            'stage': stage,
+            'questions': questions,
+            'persons': persons,
+            'seconds': round(seconds, 6),
+            'peak_bytes': peak,
+        })
+        if log is not None:
+            log(f'{stage:16} {questions:>9} вопросов {persons or "":>6} '
+                f'{seconds * 1000:10.1f} мс'
+                + (f' {peak / 1024 / 1024:8.1f} МБ' if peak is not None else ''))
+
+    for question_count in question_counts:
+        questions = generate_questions(question_count)
+        numbers = split_engine.question_numbers(questions)
+
+        txt_path = os.path.join(work_dir, f'bank_{question_count}.txt')
+        docx_path = os.path.join(work_dir, f'bank_{question_count}.docx')
+        write_txt_bank(questions, txt_path)
+        write_docx_bank(questions, docx_path)
+
+        record('load_txt', question_count, None, lambda: question_loader.load_txt_file(txt_path))
+        record('load_docx', question_count, None, lambda: question_loader.load_docx_file(docx_path))
+        record('question_store', question_count, None,
+               lambda: QuestionStore.from_questions(questions))
+        record('question_numbers', question_count, None,
+               lambda: split_engine.question_numbers(questions))
+
+        for person_count in person_counts:
+            persons = [f'Человек {i}' for i in range(1, person_count + 1)]
+
+            record('split_even', question_count, person_count,
+                   lambda: split_engine.split_even(questions, persons, numbers))
+            record('split_random', question_count, person_count,
+                   lambda: split_engine.split_random(questions, persons, 1, numbers))
+            record('split_cost', question_count, person_count,
+                   lambda: split_engine.split_by_cost(questions, persons, numbers=numbers))
+
+            persons_distribution = split_engine.split_even(questions, persons, numbers).as_dict()
+
+            if window is not None:
+                def render():
+                    window.persons_distribution = persons_distribution
+                    window.display_results()
+                    app.processEvents()
+
+                record('display_results', question_count, person_count, render)
+
+            txt_out = os.path.join(work_dir, 'results.txt')
+            record('save_txt', question_count, person_count,
+                   lambda: result_export.save_as_txt(persons_distribution, txt_out))
+
+            if result_export.HAS_DOCX:
+                docx_out = os.path.join(work_dir, 'results.docx')
+                record('save_docx', question_count, person_count,
+                       lambda: result_export.save_as_docx(persons_distribution, docx_out))
+
+        os.remove(txt_path)
+        os.remove(docx_path)
+
+    if window is not None:
+        window.close()
+    return results
+
+
+def measure_startup(target, runs=STARTUP_RUNS):
+    """Медиана времени холодного запуска target в новом процессе и рано загруженные модули"""
+    script = _STARTUP_SCRIPTS[target] + _STARTUP_EPILOGUE
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    times = []
+    loaded = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, '-c', script], cwd=cwd,
+                                   capture_output=True, text=True)
+        times.append(time.perf_counter() - start)
+        if completed.returncode != 0:
+            raise RuntimeError(f'Запуск {target} завершился с ошибкой:\n{completed.stderr}')
+        for line in completed.stdout.splitlines():
+            if line.startswith('LOADED:'):
+                loaded = [name for name in line[len('LOADED:'):].split(',') if name]
+    return statistics.median(times), loaded
+
+
+def check_startup(runs=STARTUP_RUNS, log=None):
+    """Замеры запуска по всем доступным целям. Возвращает (результаты, уложились_ли)"""
+    results = []
+    ok = True
+    for target, budget in STARTUP_BUDGET_SECONDS.items():
+        if target == 'gui' and find_spec('PyQt5') is None:
+            continue
+        seconds, loaded = measure_startup(target, runs)
+        passed = seconds <= budget and not loaded
+        ok = ok and passed
+        results.append({
+            'stage': f'startup_{target}',
+            'seconds': round(seconds, 6),
+            'budget_seconds': budget,
+            'eager_modules': loaded,
+            'passed': passed,
+        })
+        if log is not None:
+            log(f'startup_{target:9} {seconds * 1000:8.1f} мс (бюджет {budget * 1000:.0f} мс)'
+                + (f', рано загружены: {", ".join(loaded)}' if loaded else '')
+                + ('' if passed else '  ПРЕВЫШЕНИЕ'))
+    return results, ok
+
+
+def _int_list(text):
+    return [int(value) for value in text.split(',') if value.strip()]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Замеры скорости этапов обработки вопросов')
+    parser.add_argument('-q', '--questions', type=_int_list,
+                        default=list(DEFAULT_QUESTIONS),
+                        help='размеры банков через запятую (например, 1000,1000000)')
+    parser.add_argument('-p', '--persons', type=_int_list, default=list(DEFAULT_PERSONS),
+                        help='количества людей через запятую (например, 2,1000)')
+    parser.add_argument('-o', '--output', default=None,
+                        help='файл для JSON с результатами (по умолчанию stdout)')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='не замерять пик памяти (вдвое быстрее)')
+    parser.add_argument('--startup', action='store_true',
+                        help='замерить только холодный запуск и сверить с бюджетом')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    def log(line):
+        print(line, file=sys.stderr)
+
+    ok = True
+    if args.startup:
+        results, ok = check_startup(log=log)
+    else:
+        with tempfile.TemporaryDirectory(prefix='question_splitter_bench_') as work_dir:
+            results = run_benchmarks(args.questions, args.persons, work_dir,
+                                     track_memory=not args.no_memory, log=log)
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'has_docx': result_export.HAS_DOCX,
+        },
+        'results': results,
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""Поиск повторяющихся и почти одинаковых вопросов без зависимости от PyQt5.
+
+Точные повторы (после нормализации текста и номера) находятся по словарю.
+Почти одинаковые - через MinHash по парам соседних слов и LSH: вопросы
+с совпавшей полосой подписи становятся кандидатами и проверяются точным
+коэффициентом Жаккара. Попарного сравнения всех вопросов нет.
+
+Пара слов хэшируется один раз (zlib.crc32 по UTF-8 байтам, а не hash():
+встроенный хэш строк меняется от процесса к процессу из-за PYTHONHASHSEED),
+дальше вопрос - множество этих чисел: по нему строится подпись и считается
+коэффициент Жаккара. Подпись строится одним проходом (one permutation
+hashing): хэши раскладываются по NUM_HASHES корзинам, в каждой берётся
+минимум.
+"""
+import re
+import zlib
+
+from split_engine import QUESTION_NUMBER_RE
+
+
+NUM_HASHES = 24
+BANDS = 6
+ROWS_PER_BAND = NUM_HASHES // BANDS
+DEFAULT_THRESHOLD = 0.8
+# Увеличивается при любом изменении результата поиска: от неё зависит
+# ключ кэша групп повторов в question_cache
+DEDUP_VERSION = 1
+# Как часто (в вопросах) сообщать о прогрессе поиска
+PROGRESS_STEP = 4096
+
+_EMPTY_BIN = 1 << 32
+_EMPTY_BAND = (_EMPTY_BIN,) * ROWS_PER_BAND
+_PUNCTUATION_RE = re.compile(r'[^\w\s]+')
+_DIGITS_RE = re.compile(r'\d+')
+
+
+def normalize_question(question_text):
+    """Текст без номера, регистра, пунктуации и лишних пробелов"""
+    text = QUESTION_NUMBER_RE.sub('', question_text.strip(), count=1)
+    text = text.lower().replace('ё', 'е')
+    return ' '.join(_PUNCTUATION_RE.sub(' ', text).split())
+
+
+def _shingles(text):
+    """Хэши пар соседних слов нормализованного текста (одно слово - его хэш)"""
+    crc32 = zlib.crc32
+    words = text.encode('utf-8').split(b' ')
+    if len(words) == 1:
+        return {crc32(words[0])}
+    return {crc32(b' '.join(pair)) for pair in zip(words, words[1:])}
+
+
+def _signature(shingles):
+    signature = [_EMPTY_BIN] * NUM_HASHES
+    for value in shingles:
+        slot = value % NUM_HASHES
+        if value < signature[slot]:
+            signature[slot] = value
+    return signature
+
+
+def _jaccard(a, b):
+    common = len(a & b)
+    return common / (len(a) + len(b) - common)
+
+
+class _UnionFind:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, item):
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a, b):
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a != root_b:
+            # Корнем остаётся меньший индекс - первый вопрос группы
+            if root_b < root_a:
+                root_a, root_b = root_b, root_a
+            self.parent[root_b] = root_a
+
+
+def find_duplicate_clusters(questions, threshold=DEFAULT_THRESHOLD, progress=None):
+    """Группы повторов: списки индексов (от двух), первым идёт первый вопрос группы.
+
+    threshold - минимальное сходство по Жаккару для почти одинаковых
+    вопросов; при threshold >= 1 ищутся только точные повторы. Вопросы
+    с разными числами в тексте («теорема 1» и «теорема 2») почти
+    одинаковыми не считаются, вопросы из одних символов («∑ ∏», «---»)
+    повторами не считаются вовсе. progress(сделано, всего) вызывается
+    примерно раз в PROGRESS_STEP вопросов; исключение из него прерывает поиск.
+    """
+    total = 2 * len(questions)
+    union_find = _UnionFind(len(questions))
+
+    first_by_text = {}
+    unique = []
+    for index, question in enumerate(questions):
+        if progress is not None and index % PROGRESS_STEP == 0:
+            progress(index, total)
+        text = normalize_question(question)
+        if not text:
+            continue
+        first = first_by_text.setdefault(text, index)
+        if first != index:
+            union_find.union(first, index)
+        else:
+            unique.append((index, text))
+    first_by_text = None
+
+    if threshold < 1:
+        # Множества хэшей нужны только первым вопросам корзин: с ними сравнивают
+        shingle_sets = {}
+        digits = {}
+        buckets = {}
+        for position, (index, text) in enumerate(unique):
+            if progress is not None and position % PROGRESS_STEP == 0:
+                progress(len(questions) + position * len(questions) // len(unique), total)
+            shingles = _shingles(text)
+            signature = _signature(shingles)
+            index_digits = _DIGITS_RE.findall(text)
+            candidates = set()
+            for band in range(BANDS):
+                rows = tuple(signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND])
+                # Пустые корзины подписи есть у всех коротких вопросов
+                if rows == _EMPTY_BAND:
+                    continue
+                first = buckets.setdefault((band, rows), index)
+                if first != index:
+                    candidates.add(first)
+                elif index not in shingle_sets:
+                    shingle_sets[index] = shingles
+                    digits[index] = index_digits
+
+            # Сравнение только с первыми вопросами корзин: большие корзины
+            # коротких вопросов не дают квадратичного числа проверок
+            for first in sorted(candidates):
+                if (union_find.find(first) != union_find.find(index)
+                        and digits[first] == index_digits
+                        and _jaccard(shingle_sets[first], shingles) >= threshold):
+                    union_find.union(first, index)
+
+    if progress is not None:
+        progress(total, total)
+
+    groups = {}
+    for index in range(len(questions)):
+        groups.setdefault(union_find.find(index), []).append(index)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def question_units(num_questions, clusters):
+    """Единицы распределения: группа повторов целиком или отдельный вопрос.
+
+    Порядок единиц - порядок первых вопросов в исходном списке.
+    """
+    cluster_by_first = {cluster[0]: cluster for cluster in clusters}
+    skipped = {index for cluster in clusters for index in cluster[1:]}
+    return [cluster_by_first.get(index, [index])
+            for index in range(num_questions) if index not in skipped]
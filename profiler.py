@@ -0,0 +1,143 @@
+"""Замеры времени и памяти по этапам работы приложения (по желанию).
+
+Этапы размечаются через PROFILER.stage('имя') или декоратор profiled('имя').
+Пока замеры выключены, разметка почти ничего не стоит. Включаются они
+переменной окружения QUESTION_SPLITTER_PROFILE=1 или в панели диагностики.
+Результаты можно выгрузить в формате Chrome trace event (chrome://tracing,
+https://ui.perfetto.dev).
+
+tracemalloc общий для всего процесса, поэтому пик памяти этапа, который
+шёл одновременно с другим (окно и фоновый поток), включает и чужие выделения.
+Вложенные этапы сбрасывают пик tracemalloc, поэтому у каждого потока есть
+стек открытых этапов с накопленным пиком: перед сбросом текущий пик
+переносится во внешний этап.
+"""
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class StageStats:
+    __slots__ = ('calls', 'total_seconds', 'max_seconds', 'peak_bytes')
+
+    def __init__(self):
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.peak_bytes = 0
+
+
+class StageProfiler:
+    def __init__(self, enabled=False, track_memory=True):
+        self.enabled = False
+        self.track_memory = track_memory
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+        self.stats = {}
+        self.events = []
+        self.set_enabled(enabled)
+
+    def set_enabled(self, enabled):
+        """tracemalloc работает всё время, пока замеры включены"""
+        if self.track_memory:
+            if enabled and not tracemalloc.is_tracing():
+                tracemalloc.start()
+            elif not enabled and self.enabled and tracemalloc.is_tracing():
+                tracemalloc.stop()
+        self.enabled = enabled
+
+    def reset(self):
+        with self._lock:
+            self._origin = time.perf_counter()
+            self.stats = {}
+            self.events = []
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+
+        track_memory = self.track_memory and tracemalloc.is_tracing()
+        if track_memory:
+            peaks = self._peak_stack()
+            if peaks:
+                peaks[-1] = max(peaks[-1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            peaks.append(0)
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak = None
+            if track_memory:
+                peak = max(peaks.pop(), tracemalloc.get_traced_memory()[1])
+                if peaks:
+                    peaks[-1] = max(peaks[-1], peak)
+            self._record(name, start, seconds, peak)
+
+    def _peak_stack(self):
+        """Накопленные пики открытых этапов текущего потока, внешний - первый"""
+        peaks = getattr(self._local, 'peaks', None)
+        if peaks is None:
+            peaks = self._local.peaks = []
+        return peaks
+
+    def _record(self, name, start, seconds, peak):
+        with self._lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = StageStats()
+            stats.calls += 1
+            stats.total_seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            if peak is not None:
+                stats.peak_bytes = max(stats.peak_bytes, peak)
+
+            event = {
+                'name': name,
+                'ph': 'X',
+                'ts': round((start - self._origin) * 1e6),
+                'dur': round(seconds * 1e6),
+                'pid': os.getpid(),
+                'tid': threading.get_ident(),
+            }
+            if peak is not None:
+                event['args'] = {'peak_bytes': peak}
+            self.events.append(event)
+
+    def summary(self):
+        """Строки (этап, вызовов, всего с, максимум с, пик байт) по убыванию времени"""
+        with self._lock:
+            rows = [(name, s.calls, s.total_seconds, s.max_seconds, s.peak_bytes)
+                    for name, s in self.stats.items()]
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+    def chrome_trace(self):
+        with self._lock:
+            return {'traceEvents': list(self.events), 'displayTimeUnit': 'ms'}
+
+    def export_json(self, file_path):
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False)
+
+
+PROFILER = StageProfiler(enabled=os.environ.get('QUESTION_SPLITTER_PROFILE') == '1')
+
+
+def profiled(name):
+    """Декоратор: весь вызов функции - этап name в PROFILER"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with PROFILER.stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,248 @@
+"""Модели Qt для представлений окна.
+
+Модели ничего не строят заранее: текст и цвет ячейки формируются в data()
+только для тех строк, которые представление действительно отрисовывает.
+"""
+from PyQt5.QtCore import QAbstractListModel, QAbstractTableModel, QModelIndex, Qt
+from PyQt5.QtGui import QColor
+
+
+class QuestionListModel(QAbstractListModel):
+    """Все загруженные вопросы для предпросмотра, по строке на вопрос.
+
+    Строка показывает первую строку вопроса (не длиннее PREVIEW_CHARS),
+    полный текст - во всплывающей подсказке. Вопросы из групп повторов
+    подсвечиваются.
+    """
+
+    PREVIEW_CHARS = 200
+    TOOLTIP_CHARS = 2000
+
+    DUPLICATE_COLOR = QColor(255, 240, 200)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.questions = []
+        self.duplicate_of = {}
+
+    def set_questions(self, questions, clusters=None):
+        """clusters - группы повторов (списки индексов, первым идёт первый вопрос группы)"""
+        self.beginResetModel()
+        self.questions = questions
+        self.duplicate_of = {index: cluster[0]
+                             for cluster in clusters or () for index in cluster}
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.questions)
+
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row = index.row()
+
+        if role == Qt.DisplayRole:
+            question = self.questions[row]
+            first_line, newline, _ = question.partition('\n')
+            if len(first_line) > self.PREVIEW_CHARS:
+                return first_line[:self.PREVIEW_CHARS] + '...'
+            return first_line + (' ...' if newline else '')
+
+        if role == Qt.ToolTipRole:
+            text = self.questions[row][:self.TOOLTIP_CHARS]
+            first = self.duplicate_of.get(row)
+            if first is not None and first != row:
+                text += f'\n\nПовтор вопроса в строке {first + 1}'
+            elif first is not None:
+                text += '\n\nУ вопроса есть повторы'
+            return text
+
+        if role == Qt.BackgroundRole and row in self.duplicate_of:
+            return self.DUPLICATE_COLOR
+
+        return None
+
+
+class PersonListModel(QAbstractListModel):
+    """Список людей для редактора: порядок - список, проверка повтора - множество.
+
+    Добавление, переименование и удаление сообщают представлению только
+    о затронутых строках, пакетное добавление - одной вставкой.
+    """
+
+    def __init__(self, persons=(), parent=None):
+        super().__init__(parent)
+        self.persons = list(dict.fromkeys(persons))
+        self.names = set(self.persons)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.persons)
+
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role == Qt.DisplayRole:
+            return self.persons[index.row()]
+        return None
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def set_persons(self, persons):
+        self.beginResetModel()
+        self.persons = list(dict.fromkeys(persons))
+        self.names = set(self.persons)
+        self.endResetModel()
+
+    def add_persons(self, names):
+        """Добавляет новые имена в конец одной вставкой. Возвращает их количество"""
+        new_names = [name for name in dict.fromkeys(names) if name not in self.names]
+        if new_names:
+            first = len(self.persons)
+            self.beginInsertRows(QModelIndex(), first, first + len(new_names) - 1)
+            self.persons.extend(new_names)
+            self.names.update(new_names)
+            self.endInsertRows()
+        return len(new_names)
+
+    def rename(self, row, name):
+        """Переименовывает строку; False, если такое имя уже есть"""
+        if name in self.names:
+            return False
+        self.names.discard(self.persons[row])
+        self.names.add(name)
+        self.persons[row] = name
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole])
+        return True
+
+    def remove_rows(self, rows):
+        """Удаляет строки, подряд идущие - одним блоком, начиная с нижних"""
+        rows = sorted(set(rows), reverse=True)
+        i = 0
+        while i < len(rows):
+            last = first = rows[i]
+            i += 1
+            while i < len(rows) and rows[i] == first - 1:
+                first = rows[i]
+                i += 1
+            self.beginRemoveRows(QModelIndex(), first, last)
+            self.names.difference_update(self.persons[first:last + 1])
+            del self.persons[first:last + 1]
+            self.endRemoveRows()
+
+
+class DistributionTableModel(QAbstractTableModel):
+    """Таблица результатов: имя, количество вопросов и сами вопросы.
+
+    В свёрнутой строке видны первые PREVIEW_LINES вопросов, полный список
+    собирается только для раскрытых строк (toggle_expanded).
+    """
+
+    HEADERS = ('Имя', 'Кол-во вопросов', 'Вопросы')
+    PREVIEW_LINES = 3
+
+    MIN_COLOR = QColor(200, 255, 200)
+    MAX_COLOR = QColor(255, 200, 200)
+    DEFAULT_COLOR = QColor(255, 255, 255)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.persons = []
+        self.question_lists = []
+        self.expanded = set()
+        self.min_count = 0
+        self.max_count = 0
+
+    def set_distribution(self, persons_distribution):
+        self.beginResetModel()
+        self.persons = list(persons_distribution.keys())
+        self.question_lists = list(persons_distribution.values())
+        self.expanded = set()
+        self.update_extremes()
+        self.endResetModel()
+
+    def update_extremes(self):
+        counts = [len(questions) for questions in self.question_lists]
+        self.min_count = min(counts, default=0)
+        self.max_count = max(counts, default=0)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.persons)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row = index.row()
+        column = index.column()
+        questions = self.question_lists[row]
+
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return self.persons[row]
+            if column == 1:
+                return str(len(questions))
+            return self.questions_text(row)
+
+        if role == Qt.TextAlignmentRole and column < 2:
+            return Qt.AlignCenter
+
+        if role == Qt.ToolTipRole and column == 2 and row not in self.expanded:
+            if len(questions) > self.PREVIEW_LINES:
+                return 'Двойной щелчок - показать все вопросы'
+
+        if role == Qt.BackgroundRole:
+            count = len(questions)
+            if self.min_count != self.max_count:
+                if count == self.min_count:
+                    return self.MIN_COLOR
+                if count == self.max_count:
+                    return self.MAX_COLOR
+            return self.DEFAULT_COLOR
+
+        return None
+
+    def questions_text(self, row):
+        questions = self.question_lists[row]
+        if row in self.expanded or len(questions) <= self.PREVIEW_LINES:
+            return "\n".join(questions)
+
+        hidden = len(questions) - self.PREVIEW_LINES
+        return "\n".join(questions[:self.PREVIEW_LINES]) + f"\n... и еще {hidden} вопросов"
+
+    def is_expanded(self, row):
+        return row in self.expanded
+
+    def toggle_expanded(self, row):
+        """Раскрывает или сворачивает полный список вопросов строки"""
+        if row in self.expanded:
+            self.expanded.discard(row)
+        else:
+            self.expanded.add(row)
+        cell = self.index(row, 2)
+        self.dataChanged.emit(cell, cell, [Qt.DisplayRole, Qt.ToolTipRole])
@@ -0,0 +1,259 @@
+"""Дисковый кэш разобранных файлов с вопросами.
+
+Ключ - SHA-256 содержимого файла вместе с версией разборщика, поэтому
+переименованный или скопированный файл тоже попадает в кэш, а изменение
+разбора (question_loader.PARSER_VERSION) делает старые записи ненужными.
+Записи хранятся в том же виде, что и QuestionStore в памяти (смещения
+и общий UTF-8 буфер), и вытесняются по давности использования, когда
+общий размер превышает лимит. Рядом лежат найденные группы повторов:
+их ключ - хэш набора вопросов и версия поиска (dedup.DEDUP_VERSION),
+поэтому повторное открытие файла не ищет повторы заново.
+"""
+import hashlib
+import os
+import struct
+import tempfile
+import zlib
+from array import array
+
+import dedup
+import question_loader
+from question_store import QuestionStore, load_question_store
+
+
+CACHE_MAGIC = b'QSC2'
+CACHE_SUFFIX = '.qcache'
+DUPLICATES_MAGIC = b'QSD1'
+DUPLICATES_SUFFIX = '.qdup'
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_HEADER = struct.Struct('<4sI')
+
+
+def default_cache_dir():
+    """Папка кэша: QUESTION_SPLITTER_CACHE или системная папка кэша пользователя"""
+    path = os.environ.get('QUESTION_SPLITTER_CACHE')
+    if path:
+        return path
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME')
+    if not base:
+        base = os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'question_splitter')
+
+
+def file_key(file_path):
+    """Ключ кэша: хэш содержимого, способа разбора и версии разборщика"""
+    digest = hashlib.sha256()
+    kind = 'docx' if file_path.lower().endswith('.docx') else 'txt'
+    digest.update(f'{kind}:{question_loader.PARSER_VERSION}:'.encode())
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def duplicates_key(question_set_hash):
+    """Ключ групп повторов: хэш набора вопросов (split_record.questions_hash)
+    и версия поиска"""
+    return hashlib.sha256(
+        f'duplicates:{dedup.DEDUP_VERSION}:{question_set_hash}'.encode()).hexdigest()
+
+
+def encode_questions(questions):
+    """Заголовок, массив смещений и общий UTF-8 буфер, сжатые zlib"""
+    if not isinstance(questions, QuestionStore):
+        questions = QuestionStore.from_questions(questions)
+    payload = (_HEADER.pack(CACHE_MAGIC, len(questions)) + questions.offsets.tobytes()
+               + questions.buffer)
+    return zlib.compress(payload, 1)
+
+
+def decode_questions(data):
+    """QuestionStore из записи кэша: строки не декодируются"""
+    payload = zlib.decompress(data)
+    magic, count = _HEADER.unpack_from(payload)
+    if magic != CACHE_MAGIC:
+        raise ValueError('Неверный формат записи кэша')
+
+    offsets = array('q')
+    start = _HEADER.size
+    end = start + offsets.itemsize * (count + 1)
+    offsets.frombytes(payload[start:end])
+    buffer = payload[end:]
+    if len(offsets) != count + 1 or offsets[0] != 0 or offsets[-1] != len(buffer):
+        raise ValueError('Запись кэша повреждена')
+    return QuestionStore(buffer, offsets)
+
+
+def encode_clusters(clusters):
+    """Заголовок и плоский массив: размер группы, затем её индексы"""
+    flat = array('i')
+    for cluster in clusters:
+        flat.append(len(cluster))
+        flat.extend(cluster)
+    return zlib.compress(_HEADER.pack(DUPLICATES_MAGIC, len(clusters)) + flat.tobytes(), 1)
+
+
+def decode_clusters(data):
+    payload = zlib.decompress(data)
+    magic, count = _HEADER.unpack_from(payload)
+    if magic != DUPLICATES_MAGIC:
+        raise ValueError('Неверный формат записи кэша')
+
+    flat = array('i')
+    flat.frombytes(payload[_HEADER.size:])
+    clusters = []
+    position = 0
+    for _ in range(count):
+        size = flat[position]
+        clusters.append(flat[position + 1:position + 1 + size].tolist())
+        position += 1 + size
+    if position != len(flat) or any(len(cluster) < 2 for cluster in clusters):
+        raise ValueError('Запись кэша повреждена')
+    return clusters
+
+
+_CACHE_SUFFIXES = (CACHE_SUFFIX, DUPLICATES_SUFFIX)
+
+
+class QuestionCache:
+    """LRU-кэш списков вопросов и групп повторов в отдельной папке, по файлу на запись"""
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+
+    def _path(self, key, suffix=CACHE_SUFFIX):
+        return os.path.join(self.cache_dir, key + suffix)
+
+    def get(self, key):
+        """Возвращает QuestionStore или None, если записи нет или она повреждена"""
+        return self._read(self._path(key), decode_questions)
+
+    def put(self, key, questions):
+        self._write(self._path(key), encode_questions(questions))
+
+    def get_clusters(self, key):
+        """Группы повторов по duplicates_key или None"""
+        return self._read(self._path(key, DUPLICATES_SUFFIX), decode_clusters)
+
+    def put_clusters(self, key, clusters):
+        self._write(self._path(key, DUPLICATES_SUFFIX), encode_clusters(clusters))
+
+    def _read(self, path, decode):
+        try:
+            with open(path, 'rb') as f:
+                value = decode(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, IndexError, zlib.error, struct.error, UnicodeDecodeError):
+            self._remove(path)
+            return None
+
+        # Время изменения служит отметкой последнего использования для LRU
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def _write(self, path, data):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        if len(data) > self.max_bytes:
+            return
+
+        # Запись через временный файл: параллельные процессы пакетного режима
+        # не увидят недописанную запись
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            self._remove(tmp_path)
+            raise
+
+        self.evict()
+
+    def evict(self):
+        """Удаляет самые давно использованные записи сверх лимита размера"""
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(_CACHE_SUFFIXES):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(_CACHE_SUFFIXES):
+                    self._remove(entry.path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def load_questions_cached(file_path, progress=None, cache=None):
+    """Загружает вопросы через кэш. Возвращает (QuestionStore, взяты_ли_из_кэша).
+
+    Ошибки самого кэша (нет прав, диск заполнен) не мешают загрузке.
+    """
+    if cache is None:
+        cache = QuestionCache()
+
+    key = file_key(file_path)
+    questions = cache.get(key)
+    if questions is not None:
+        if progress is not None:
+            size = os.path.getsize(file_path)
+            progress(size, size)
+        return questions, True
+
+    questions = load_question_store(file_path, progress)
+    try:
+        cache.put(key, questions)
+    except OSError:
+        pass
+    return questions, False
+
+
+def find_duplicates_cached(questions, question_set_hash, progress=None, cache=None):
+    """Группы повторов через кэш. Возвращает (группы, взяты_ли_из_кэша).
+
+    progress - как у dedup.find_duplicate_clusters.
+    """
+    if cache is None:
+        cache = QuestionCache()
+
+    key = duplicates_key(question_set_hash)
+    clusters = cache.get_clusters(key)
+    if clusters is not None:
+        return clusters, True
+
+    clusters = dedup.find_duplicate_clusters(questions, progress=progress)
+    try:
+        cache.put_clusters(key, clusters)
+    except OSError:
+        pass
+    return clusters, False
@@ -0,0 +1,291 @@
+"""Чтение вопросов из TXT и DOCX файлов без зависимости от PyQt5.
+
+DOCX читается напрямую из zip-архива стандартной библиотекой, поэтому
+python-docx для загрузки не нужен.
+
+Строки TXT и абзацы (ячейки) DOCX собираются в вопросы одним проходом
+(segment_questions): строка с номером вида «1.», «2)» или «3-» начинает
+новый вопрос, строки без номера (варианты ответа, подпункты) дописываются
+к текущему.
+"""
+import os
+import re
+import zipfile
+from xml.etree import ElementTree
+
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_BODY = _W + 'body'
+_W_P = _W + 'p'
+_W_R = _W + 'r'
+_W_T = _W + 't'
+_W_TAB = _W + 'tab'
+_W_BR = _W + 'br'
+_W_CR = _W + 'cr'
+_W_TC = _W + 'tc'
+_W_TC_PR = _W + 'tcPr'
+_W_VMERGE = _W + 'vMerge'
+_W_VAL = _W + 'val'
+_W_TXBX_CONTENT = _W + 'txbxContent'
+
+# Элементы текста внутри <w:r>, как их понимает python-docx
+_RUN_TEXT = {_W_T: None, _W_TAB: '\t', _W_BR: '\n', _W_CR: '\n'}
+
+# Номер в начале вопроса и его разделитель
+QUESTION_NUMBER_RE = re.compile(r'^(\d+)([\.\)\-])')
+
+# Начало нового вопроса при сборке строк: после разделителя пробел или конец
+# строки, поэтому «2023-2024 учебный год» и «1.5 литра» номером не считаются
+_QUESTION_START_RE = re.compile(r'^(\d+)([.)\-])(?=\s|$)')
+
+# Увеличивается при любом изменении результата разбора: от неё зависит
+# ключ кэша в question_cache
+PARSER_VERSION = 3
+
+# Как часто (в байтах) сообщать о прогрессе чтения
+PROGRESS_STEP = 256 * 1024
+READ_BUFFER_SIZE = 64 * 1024
+
+
+def segment_questions(lines):
+    """Собирает строки в вопросы за один проход без возврата назад.
+
+    lines - непустые строки без пробелов по краям. Строки вопроса
+    соединяются переводом строки. Новый вопрос начинает строка с номером
+    и тем же разделителем, что у нумерации вопросов: при вопросах «1.»
+    подпункты «1)» остаются внутри вопроса. Разделитель закрепляется
+    строкой с номером 1 или второй строкой с тем же разделителем, поэтому
+    одиночная нумерованная строка в шапке файла его не задаёт. Строки до
+    первого номера (и все строки файла без нумерации) - отдельные вопросы.
+    """
+    match_start = _QUESTION_START_RE.match
+    delimiter = None
+    fixed = False
+    parts = []
+
+    for line in lines:
+        match = match_start(line)
+        if match is None:
+            new_question = delimiter is None
+        elif fixed:
+            new_question = match[2] == delimiter
+        elif delimiter is None or match[2] == delimiter or int(match[1]) == 1:
+            fixed = delimiter is not None or int(match[1]) == 1
+            delimiter = match[2]
+            new_question = True
+        else:
+            new_question = False
+
+        if new_question and parts:
+            yield parts[0] if len(parts) == 1 else '\n'.join(parts)
+            parts = []
+        parts.append(line)
+
+    if parts:
+        yield parts[0] if len(parts) == 1 else '\n'.join(parts)
+
+
+def iter_txt_lines(file_path, progress=None):
+    """Построчно читает TXT файл и выдаёт непустые строки без пробелов по краям.
+
+    Файл не загружается в память целиком. progress(прочитано_байт, всего_байт)
+    вызывается примерно раз в PROGRESS_STEP байт и в конце чтения.
+    """
+    total = os.path.getsize(file_path)
+    bytes_read = 0
+    last_reported = 0
+    # BOM (его пишет Блокнот Windows) может стоять только перед первой строкой
+    encoding = 'utf-8-sig'
+
+    with open(file_path, 'rb', buffering=READ_BUFFER_SIZE) as f:
+        for raw_line in f:
+            bytes_read += len(raw_line)
+            # splitlines() ловит и другие разделители строк (\r, \u2028...),
+            # как раньше при разборе всего содержимого файла
+            for line in raw_line.decode(encoding).splitlines():
+                line = line.strip()
+                if line:
+                    yield line
+            encoding = 'utf-8'
+
+            if progress is not None and bytes_read - last_reported >= PROGRESS_STEP:
+                last_reported = bytes_read
+                progress(bytes_read, total)
+
+    if progress is not None:
+        progress(bytes_read, total)
+
+
+def iter_txt_questions(file_path, progress=None):
+    """Вопросы TXT файла, собранные из строк segment_questions"""
+    return segment_questions(iter_txt_lines(file_path, progress))
+
+
+def load_txt_file(file_path, progress=None):
+    """Загружает вопросы из TXT файла"""
+    return list(iter_txt_questions(file_path, progress))
+
+
+class _CountingReader:
+    """Обёртка над файлом, считающая прочитанные байты для прогресса"""
+
+    def __init__(self, raw, total, progress):
+        self.raw = raw
+        self.total = total
+        self.progress = progress
+        self.bytes_read = 0
+        self.last_reported = 0
+
+    def read(self, size=-1):
+        data = self.raw.read(size)
+        self.bytes_read += len(data)
+        if self.progress is not None and self.bytes_read - self.last_reported >= PROGRESS_STEP:
+            self.last_reported = self.bytes_read
+            self.progress(self.bytes_read, self.total)
+        return data
+
+
+def iter_docx_blocks(file_path, progress=None):
+    """Потоково разбирает word/document.xml и выдаёт тексты блоков по порядку.
+
+    Блок - непустой абзац вне таблиц или непустая ячейка таблицы (её
+    абзацы через перевод строки). Продолжения
+    вертикально объединённых ячеек пропускаются, чтобы текст не повторялся.
+    Разобранные элементы сразу удаляются из дерева, поэтому память не растёт
+    с размером документа. progress(прочитано_байт, всего_байт) считает
+    распакованный XML.
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        info = archive.getinfo('word/document.xml')
+        with archive.open(info) as raw:
+            source = _CountingReader(raw, info.file_size, progress)
+            paragraphs = []  # стек текстов открытых абзацев
+            cells = []  # стек абзацев открытых ячеек (таблицы бывают вложенными)
+            textbox_depth = 0
+            run_depth = 0
+            depth = 0
+            body = None
+
+            for event, elem in ElementTree.iterparse(source, events=('start', 'end')):
+                tag = elem.tag
+                if event == 'start':
+                    depth += 1
+                    if tag == _W_P:
+                        paragraphs.append([])
+                    elif tag == _W_R:
+                        run_depth += 1
+                    elif tag == _W_TC:
+                        cells.append([])
+                    elif tag == _W_TXBX_CONTENT:
+                        textbox_depth += 1
+                    elif tag == _W_BODY:
+                        body = elem
+                    continue
+
+                depth -= 1
+                # <w:tab> встречается и в описании позиций табуляции абзаца,
+                # текстом он является только внутри <w:r>
+                if run_depth and paragraphs and tag in _RUN_TEXT:
+                    if tag == _W_T:
+                        if elem.text:
+                            paragraphs[-1].append(elem.text)
+                    else:
+                        paragraphs[-1].append(_RUN_TEXT[tag])
+                elif tag == _W_R:
+                    run_depth -= 1
+                elif tag == _W_TXBX_CONTENT:
+                    textbox_depth -= 1
+                elif tag == _W_P:
+                    text = ''.join(paragraphs.pop())
+                    # Надписи (текстовые поля) не считаются текстом документа
+                    if textbox_depth == 0:
+                        if cells:
+                            cells[-1].append(text)
+                        else:
+                            text = text.strip()
+                            if text:
+                                yield text
+                    elem.clear()
+                elif tag == _W_TC:
+                    cell_paragraphs = cells.pop()
+                    if not _is_vmerge_continuation(elem):
+                        text = '\n'.join(cell_paragraphs).strip()
+                        if text:
+                            yield text
+                    elem.clear()
+
+                # Элементы верхнего уровня body уже обработаны целиком
+                if body is not None and depth == 2:
+                    body.clear()
+
+    if progress is not None:
+        progress(source.bytes_read, source.total)
+
+
+def _is_vmerge_continuation(cell):
+    vmerge = cell.find(f'{_W_TC_PR}/{_W_VMERGE}')
+    return vmerge is not None and vmerge.get(_W_VAL, 'continue') != 'restart'
+
+
+def iter_docx_questions(file_path, progress=None):
+    """Вопросы DOCX файла, собранные из абзацев и ячеек segment_questions"""
+    return segment_questions(iter_docx_blocks(file_path, progress))
+
+
+def load_docx_file(file_path, progress=None):
+    """Загружает вопросы из DOCX файла"""
+    return list(iter_docx_questions(file_path, progress))
+
+
+def iter_questions(file_path, progress=None):
+    """Выбирает разбор по расширению файла"""
+    if file_path.lower().endswith('.docx'):
+        return iter_docx_questions(file_path, progress)
+    return iter_txt_questions(file_path, progress)
+
+
+def parse_person_line(line):
+    """Разбирает строку «Имя;вес;минимум;максимум», всё кроме имени необязательно.
+
+    Возвращает (имя, вес, минимум, максимум); максимум None - без ограничения.
+    """
+    parts = [part.strip() for part in line.split(';')]
+    parts += [''] * (4 - len(parts))
+    name, weight, min_count, max_count = parts[:4]
+    return (name,
+            float(weight.replace(',', '.')) if weight else 1.0,
+            int(min_count) if min_count else 0,
+            int(max_count) if max_count else None)
+
+
+def load_persons_limits(file_path):
+    """Загружает людей с весами и границами: (люди, веса, минимумы, максимумы).
+
+    Повторное имя игнорируется, как и в редакторе списка людей.
+    """
+    rows = {}
+    # Список людей читается построчно: сборка многострочных вопросов к нему не относится
+    for line in iter_txt_lines(file_path):
+        try:
+            row = parse_person_line(line)
+        except ValueError:
+            raise ValueError(f'Неверная строка в списке людей: {line}')
+        if row[0]:
+            rows.setdefault(row[0], row)
+
+    if not rows:
+        return [], [], [], []
+    persons, weights, min_counts, max_counts = (list(column) for column in zip(*rows.values()))
+    return persons, weights, min_counts, max_counts
+
+
+def iter_person_names(lines):
+    """Имена из строк по порядку, вместе с повторами.
+
+    Строка - «Имя», «Имя;вес;минимум;максимум» или строка таблицы,
+    скопированной из Excel (столбцы через табуляцию, имя в первом).
+    """
+    for line in lines:
+        name = line.split('\t', 1)[0].split(';', 1)[0].strip()
+        if name:
+            yield name
@@ -1,26 +1,25 @@
 import os
 import random
 import sys
-import re
+from bisect import bisect_right
 
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
 
-try:
-    import docx
-
-    HAS_DOCX = True
-except ImportError:
-    HAS_DOCX = False
-    print("Библиотека python-docx не установлена. DOCX файлы не будут поддерживаться.")
+import question_loader
+import split_engine
+import workers
+from profiler import PROFILER, profiled
+from qt_models import DistributionTableModel, PersonListModel, QuestionListModel
+from result_export import HAS_DOCX
+from split_record import RECORD_SUFFIX
 
 
 class PersonEditorDialog(QDialog):
     def __init__(self, initial_persons, parent=None):
         super().__init__(parent)
         self.initial_persons = initial_persons.copy()
-        self.persons = initial_persons.copy()
         self.setWindowTitle('Редактирование списка людей')
         self.setGeometry(200, 200, 500, 400)
         self.initUI()
@@ -31,15 +30,21 @@ class PersonEditorDialog(QDialog):
         label = QLabel('Добавьте, удалите или измените имена людей:')
         layout.addWidget(label)
 
-        self.list_widget = QListWidget()
-        self.list_widget.setSelectionMode(QListWidget.SingleSelection)
-        self.update_list()
-        layout.addWidget(self.list_widget)
+        self.model = PersonListModel(self.initial_persons, self)
+        self.list_view = QListView()
+        self.list_view.setModel(self.model)
+        self.list_view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.list_view.setUniformItemSizes(True)
+        layout.addWidget(self.list_view)
+
+        self.count_label = QLabel()
+        layout.addWidget(self.count_label)
 
         edit_panel = QHBoxLayout()
 
         self.name_edit = QLineEdit()
         self.name_edit.setPlaceholderText('Введите имя')
+        self.name_edit.returnPressed.connect(self.add_person)
         edit_panel.addWidget(self.name_edit)
 
         add_btn = QPushButton('Добавить')
@@ -56,6 +61,21 @@ class PersonEditorDialog(QDialog):
 
         layout.addLayout(edit_panel)
 
+        import_panel = QHBoxLayout()
+
+        import_file_btn = QPushButton('Импорт из файла...')
+        import_file_btn.setToolTip('TXT файл: по имени в строке (можно «Имя;вес;минимум;максимум»)')
+        import_file_btn.clicked.connect(self.import_from_file)
+        import_panel.addWidget(import_file_btn)
+
+        paste_btn = QPushButton('Вставить из буфера')
+        paste_btn.setToolTip('По имени в строке; из таблицы берётся первый столбец')
+        paste_btn.clicked.connect(self.import_from_clipboard)
+        import_panel.addWidget(paste_btn)
+
+        import_panel.addStretch()
+        layout.addLayout(import_panel)
+
         button_box = QDialogButtonBox(
             QDialogButtonBox.Ok | QDialogButtonBox.Cancel | QDialogButtonBox.Reset
         )
@@ -64,50 +84,213 @@ class PersonEditorDialog(QDialog):
         button_box.button(QDialogButtonBox.Reset).clicked.connect(self.reset)
         layout.addWidget(button_box)
 
-        self.list_widget.itemSelectionChanged.connect(self.on_selection_changed)
+        self.list_view.selectionModel().currentChanged.connect(self.on_current_changed)
+        for signal in (self.model.rowsInserted, self.model.rowsRemoved, self.model.modelReset):
+            signal.connect(self.update_count)
+        self.update_count()
 
-    def update_list(self):
-        self.list_widget.clear()
-        for person in self.persons:
-            self.list_widget.addItem(person)
+    def update_count(self):
+        self.count_label.setText(f'Людей: {self.model.rowCount()}')
 
-    def on_selection_changed(self):
-        selected_items = self.list_widget.selectedItems()
-        if selected_items:
-            self.name_edit.setText(selected_items[0].text())
+    def on_current_changed(self, current, previous):
+        if current.isValid():
+            self.name_edit.setText(self.model.persons[current.row()])
 
     def add_person(self):
         name = self.name_edit.text().strip()
-        if name and name not in self.persons:
-            self.persons.append(name)
-            self.update_list()
+        if name and self.model.add_persons([name]):
+            self.list_view.scrollToBottom()
             self.name_edit.clear()
 
     def update_person(self):
-        selected_items = self.list_widget.selectedItems()
-        if selected_items and self.name_edit.text().strip():
-            old_name = selected_items[0].text()
-            new_name = self.name_edit.text().strip()
-            if new_name and new_name not in self.persons:
-                index = self.persons.index(old_name)
-                self.persons[index] = new_name
-                self.update_list()
+        current = self.list_view.currentIndex()
+        new_name = self.name_edit.text().strip()
+        if current.isValid() and new_name:
+            self.model.rename(current.row(), new_name)
 
     def remove_person(self):
-        selected_items = self.list_widget.selectedItems()
-        if selected_items:
-            name = selected_items[0].text()
-            self.persons.remove(name)
-            self.update_list()
+        rows = [index.row() for index in self.list_view.selectionModel().selectedRows()]
+        if rows:
+            self.model.remove_rows(rows)
             self.name_edit.clear()
 
+    def import_names(self, names, source):
+        """names - все имена источника, с повторами: модель сама их отбрасывает"""
+        added = self.model.add_persons(names)
+        if added:
+            self.list_view.scrollToBottom()
+        QMessageBox.information(self, 'Импорт',
+                                f'{source}: добавлено {added}, '
+                                f'уже были в списке или повторялись {len(names) - added}')
+
+    def import_from_file(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Выберите файл со списком людей",
+            "",
+            "Текстовые файлы (*.txt);;Все файлы (*.*)"
+        )
+        if not file_path:
+            return
+        try:
+            names = list(question_loader.iter_person_names(
+                question_loader.iter_txt_lines(file_path)))
+        except (OSError, UnicodeDecodeError) as e:
+            QMessageBox.critical(self, 'Ошибка', f'Не удалось прочитать файл:\n{e}')
+            return
+        self.import_names(names, os.path.basename(file_path))
+
+    def import_from_clipboard(self):
+        lines = QApplication.clipboard().text().splitlines()
+        names = list(question_loader.iter_person_names(lines))
+        self.import_names(names, 'Буфер обмена')
+
     def reset(self):
-        self.persons = self.initial_persons.copy()
-        self.update_list()
+        self.model.set_persons(self.initial_persons)
         self.name_edit.clear()
 
     def get_persons(self):
-        return self.persons
+        return list(self.model.persons)
+
+
+class PersonLimitsDialog(QDialog):
+    """Веса и границы количества вопросов для распределения по весам"""
+
+    DEFAULT_LIMITS = (1.0, 0, None)
+
+    def __init__(self, persons, limits, parent=None):
+        super().__init__(parent)
+        self.persons = list(persons)
+        self.limits = dict(limits)
+        self.setWindowTitle('Распределение по весам')
+        self.setGeometry(200, 200, 500, 500)
+        self.initUI()
+
+    def initUI(self):
+        layout = QVBoxLayout(self)
+
+        label = QLabel('Вес 2 - вдвое больше вопросов, чем при весе 1.\n'
+                       'Пустой максимум - без ограничения.')
+        layout.addWidget(label)
+
+        self.table = QTableWidget(len(self.persons), 4)
+        self.table.setHorizontalHeaderLabels(['Имя', 'Вес', 'Минимум', 'Максимум'])
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        for row, person in enumerate(self.persons):
+            weight, min_count, max_count = self.limits.get(person, self.DEFAULT_LIMITS)
+            name_item = QTableWidgetItem(person)
+            name_item.setFlags(name_item.flags() ^ Qt.ItemIsEditable)
+            self.table.setItem(row, 0, name_item)
+            self.table.setItem(row, 1, QTableWidgetItem(f'{weight:g}'))
+            self.table.setItem(row, 2, QTableWidgetItem(str(min_count)))
+            self.table.setItem(row, 3, QTableWidgetItem('' if max_count is None else str(max_count)))
+        layout.addWidget(self.table)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def accept(self):
+        limits = {}
+        for row, person in enumerate(self.persons):
+            try:
+                weight = float(self.table.item(row, 1).text().replace(',', '.') or 1)
+                min_count = int(self.table.item(row, 2).text() or 0)
+                max_text = self.table.item(row, 3).text().strip()
+                max_count = int(max_text) if max_text else None
+            except ValueError:
+                QMessageBox.warning(self, 'Ошибка', f'Неверное число в строке «{person}»')
+                return
+            limits[person] = (weight, min_count, max_count)
+        self.limits = limits
+        super().accept()
+
+    def get_limits(self):
+        return self.limits
+
+
+class DiagnosticsPanel(QWidget):
+    """Сворачиваемая панель с замерами этапов из profiler.PROFILER"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.initUI()
+
+    def initUI(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.toggle_btn = QToolButton()
+        self.toggle_btn.setText('Диагностика')
+        self.toggle_btn.setCheckable(True)
+        self.toggle_btn.setToolButtonStyle(Qt.ToolButtonTextBesideIcon)
+        self.toggle_btn.setArrowType(Qt.RightArrow)
+        self.toggle_btn.setAutoRaise(True)
+        self.toggle_btn.toggled.connect(self.set_expanded)
+        layout.addWidget(self.toggle_btn)
+
+        self.content = QWidget()
+        content_layout = QVBoxLayout(self.content)
+
+        controls = QHBoxLayout()
+        self.enable_check = QCheckBox('Замерять время и память этапов')
+        self.enable_check.setChecked(PROFILER.enabled)
+        self.enable_check.toggled.connect(PROFILER.set_enabled)
+        controls.addWidget(self.enable_check)
+        controls.addStretch()
+
+        reset_btn = QPushButton('Сбросить')
+        reset_btn.clicked.connect(self.reset)
+        controls.addWidget(reset_btn)
+
+        export_btn = QPushButton('Экспорт JSON...')
+        export_btn.clicked.connect(self.export_trace)
+        controls.addWidget(export_btn)
+        content_layout.addLayout(controls)
+
+        self.stats_table = QTableWidget(0, 5)
+        self.stats_table.setHorizontalHeaderLabels(
+            ['Этап', 'Вызовов', 'Всего, мс', 'Максимум, мс', 'Пик памяти, МБ'])
+        self.stats_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.stats_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.stats_table.setMaximumHeight(180)
+        content_layout.addWidget(self.stats_table)
+
+        self.content.setVisible(False)
+        layout.addWidget(self.content)
+
+    def set_expanded(self, expanded):
+        self.toggle_btn.setArrowType(Qt.DownArrow if expanded else Qt.RightArrow)
+        self.content.setVisible(expanded)
+        if expanded:
+            self.refresh()
+
+    def refresh(self):
+        if not self.content.isVisible():
+            return
+        rows = PROFILER.summary()
+        self.stats_table.setRowCount(len(rows))
+        for row, (name, calls, total, maximum, peak) in enumerate(rows):
+            values = (name, str(calls), f'{total * 1000:.1f}', f'{maximum * 1000:.1f}',
+                      f'{peak / 1024 / 1024:.1f}')
+            for column, value in enumerate(values):
+                self.stats_table.setItem(row, column, QTableWidgetItem(value))
+
+    def reset(self):
+        PROFILER.reset()
+        self.refresh()
+
+    def export_trace(self):
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, 'Экспорт замеров', 'trace.json',
+            'Chrome trace (*.json);;Все файлы (*.*)')
+        if not file_path:
+            return
+        try:
+            PROFILER.export_json(file_path)
+        except OSError as e:
+            QMessageBox.critical(self, 'Ошибка', f'Ошибка при сохранении:\n{str(e)}')
 
 
 class QuestionSplitterApp(QMainWindow):
@@ -116,21 +299,35 @@ class QuestionSplitterApp(QMainWindow):
         self.default_persons = []
         self.persons = self.default_persons.copy()
         self.questions = []
+        self.question_numbers = None
+        self.questions_hash = None
+        # None - повторы в загруженном файле ещё не искали
+        self.duplicate_clusters = None
+        # Распределение (режим, границы), ждущее окончания поиска повторов
+        self.pending_split = None
+        self.duplicate_rows = []
+        self.search_index = None
         self.current_file_path = ""
         self.persons_distribution = {}
+        self.distribution = None
+        self.split_record = None
+        self.person_limits = {}
+
+        # Один поток: задачи выполняются по очереди, поэтому второй файл можно
+        # поставить в очередь, пока разбирается первый
+        self.thread_pool = QThreadPool()
+        self.thread_pool.setMaxThreadCount(1)
+        self.active_tasks = []
 
         global HAS_DOCX
         if not HAS_DOCX:
-            print("Предупреждение: библиотека python-docx не установлена. DOCX файлы не будут поддерживаться.")
+            print("Предупреждение: библиотека python-docx не установлена. Сохранение в DOCX не будет поддерживаться.")
 
         self.initUI()
 
     def extract_question_number(self, question_text):
         """Извлекает номер вопроса из текста"""
-        match = re.search(r'^(\d+)[\.\)\-]', question_text.strip())
-        if match:
-            return int(match.group(1))
-        return 0
+        return split_engine.extract_question_number(question_text)
 
     def initUI(self):
         self.setWindowTitle('Распределение вопросов')
@@ -165,6 +362,20 @@ class QuestionSplitterApp(QMainWindow):
         self.random_split_btn.setMinimumHeight(40)
         top_panel1.addWidget(self.random_split_btn)
 
+        self.cost_split_btn = QPushButton('⏱ По сложности')
+        self.cost_split_btn.setToolTip('Выравнивает суммарную длину вопросов (или метку {N} '
+                                       'в конце строки) вместо их количества')
+        self.cost_split_btn.clicked.connect(self.split_questions_by_cost)
+        self.cost_split_btn.setEnabled(False)
+        self.cost_split_btn.setMinimumHeight(40)
+        top_panel1.addWidget(self.cost_split_btn)
+
+        self.weighted_split_btn = QPushButton('📊 Распределение по весам')
+        self.weighted_split_btn.clicked.connect(self.split_questions_weighted)
+        self.weighted_split_btn.setEnabled(False)
+        self.weighted_split_btn.setMinimumHeight(40)
+        top_panel1.addWidget(self.weighted_split_btn)
+
         self.save_btn = QPushButton('Сохранить результаты')
         self.save_btn.setIcon(self.style().standardIcon(QStyle.SP_DialogSaveButton))
         self.save_btn.clicked.connect(self.save_results)
@@ -204,10 +415,53 @@ class QuestionSplitterApp(QMainWindow):
         preview_group = QGroupBox("Предпросмотр вопросов")
         preview_layout = QVBoxLayout()
 
-        self.preview_text = QTextEdit()
-        self.preview_text.setReadOnly(True)
-        self.preview_text.setMaximumHeight(450)
-        preview_layout.addWidget(self.preview_text)
+        preview_header = QHBoxLayout()
+        self.preview_info_label = QLabel('Вопросы не загружены')
+        preview_header.addWidget(self.preview_info_label)
+        preview_header.addStretch()
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText('Поиск по тексту или #номер')
+        self.search_edit.returnPressed.connect(self.find_next)
+        preview_header.addWidget(self.search_edit)
+        self.find_btn = QPushButton('Найти далее')
+        self.find_btn.clicked.connect(self.find_next)
+        preview_header.addWidget(self.find_btn)
+        self.next_duplicate_btn = QPushButton('Следующий повтор')
+        self.next_duplicate_btn.clicked.connect(self.next_duplicate)
+        self.next_duplicate_btn.setEnabled(False)
+        preview_header.addWidget(self.next_duplicate_btn)
+        preview_layout.addLayout(preview_header)
+
+        self.preview_model = QuestionListModel(self)
+        self.preview_list = QListView()
+        self.preview_list.setModel(self.preview_model)
+        # Одинаковая высота строк: представление не измеряет каждый вопрос
+        self.preview_list.setUniformItemSizes(True)
+        self.preview_list.setMaximumHeight(450)
+        preview_layout.addWidget(self.preview_list)
+
+        self.group_duplicates_check = QCheckBox(
+            'Искать повторяющиеся и почти одинаковые вопросы и отдавать каждую группу одному человеку')
+        self.group_duplicates_check.setChecked(True)
+        self.group_duplicates_check.toggled.connect(self.on_group_duplicates_toggled)
+        preview_layout.addWidget(self.group_duplicates_check)
+
+        seed_layout = QHBoxLayout()
+        seed_layout.addWidget(QLabel('Seed случайного распределения:'))
+        self.seed_edit = QLineEdit()
+        self.seed_edit.setValidator(QIntValidator(0, 2147483647, self))
+        self.seed_edit.setPlaceholderText('новый при каждом распределении')
+        self.seed_edit.setToolTip('Одинаковые seed, вопросы и список людей всегда дают '
+                                  'одинаковое распределение')
+        seed_layout.addWidget(self.seed_edit)
+        self.restore_btn = QPushButton('Восстановить по записи...')
+        self.restore_btn.setToolTip(f'Восстанавливает распределение из файла {RECORD_SUFFIX} '
+                                    f'для загруженных вопросов')
+        self.restore_btn.clicked.connect(self.restore_split_dialog)
+        self.restore_btn.setEnabled(False)
+        seed_layout.addWidget(self.restore_btn)
+        seed_layout.addStretch()
+        preview_layout.addLayout(seed_layout)
 
         preview_group.setLayout(preview_layout)
         main_layout.addWidget(preview_group)
@@ -215,22 +469,42 @@ class QuestionSplitterApp(QMainWindow):
         results_group = QGroupBox("Результаты распределения")
         results_layout = QVBoxLayout()
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(3)
-        self.table.setHorizontalHeaderLabels(['Имя', 'Кол-во вопросов', 'Вопросы'])
+        self.results_model = DistributionTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.results_model)
         self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
         self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeToContents)
         self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        # Высота свёрнутых строк одинакова и не измеряется по тексту;
+        # раскрытая строка подгоняется под содержимое отдельно
+        line_height = self.table.fontMetrics().lineSpacing()
+        self.collapsed_row_height = line_height * (DistributionTableModel.PREVIEW_LINES + 1) + 8
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(self.collapsed_row_height)
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setWordWrap(True)
+        self.table.doubleClicked.connect(self.toggle_result_row)
         results_layout.addWidget(self.table)
 
         results_group.setLayout(results_layout)
         main_layout.addWidget(results_group)
 
+        progress_panel = QHBoxLayout()
+
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
-        main_layout.addWidget(self.progress_bar)
+        progress_panel.addWidget(self.progress_bar)
+
+        self.cancel_btn = QPushButton('Отмена')
+        self.cancel_btn.clicked.connect(self.cancel_tasks)
+        self.cancel_btn.setVisible(False)
+        progress_panel.addWidget(self.cancel_btn)
+
+        main_layout.addLayout(progress_panel)
+
+        self.diagnostics_panel = DiagnosticsPanel()
+        main_layout.addWidget(self.diagnostics_panel)
 
         self.update_persons_info()
 
@@ -242,14 +516,51 @@ class QuestionSplitterApp(QMainWindow):
                 self.persons = new_persons
                 self.update_persons_info()
 
-                if self.questions:
+                current = (self.distribution is not None
+                           and self.distribution.questions is self.questions)
+                if current and split_engine.can_rebalance(self.distribution):
+                    self.ask_rebalance()
+                elif self.questions:
                     reply = QMessageBox.question(
                         self, 'Перераспределить вопросы?',
                         'Хотите перераспределить вопросы с новым списком людей?',
                         QMessageBox.Yes | QMessageBox.No
                     )
                     if reply == QMessageBox.Yes:
-                        self.split_questions()
+                        self.resplit()
+
+    def ask_rebalance(self):
+        box = QMessageBox(self)
+        box.setIcon(QMessageBox.Question)
+        box.setWindowTitle('Перераспределить вопросы?')
+        box.setText('Список людей изменился. Как перераспределить вопросы?')
+        box.setInformativeText('«Только изменения» переносит вопросы ушедших людей и '
+                               'нагружает новых, не трогая остальные назначения.')
+        incremental_btn = box.addButton('Только изменения', QMessageBox.AcceptRole)
+        full_btn = box.addButton('Заново', QMessageBox.ActionRole)
+        box.addButton('Нет', QMessageBox.RejectRole)
+        box.setDefaultButton(incremental_btn)
+        box.exec_()
+
+        if box.clickedButton() is incremental_btn:
+            self.start_task(workers.rebalance_task,
+                            (self.distribution, list(self.persons), self.questions_hash),
+                            self.on_rebalance_finished, 'Ошибка при перераспределении')
+        elif box.clickedButton() is full_btn:
+            self.resplit()
+
+    def resplit(self):
+        """Распределяет заново тем же способом, что и текущее распределение"""
+        mode = None
+        if self.distribution is not None and self.distribution.questions is self.questions:
+            mode = self.distribution.mode or self.split_record.mode
+        if mode == 'weighted':
+            # Для новых людей нужны веса и границы
+            self.split_questions_weighted()
+        elif mode in split_engine.SPLIT_MODES:
+            self.start_split(mode)
+        else:
+            self.split_questions()
 
     def update_persons_info(self):
         self.persons_info_label.setText(f'Людей: {len(self.persons)}')
@@ -270,151 +581,172 @@ class QuestionSplitterApp(QMainWindow):
         if file_path:
             self.load_file(file_path)
 
-    def load_file(self, file_path):
-        self.progress_bar.setVisible(True)
+    def start_task(self, fn, args, on_finished, error_text):
+        """Запускает fn(task, *args) в фоновом потоке"""
+        task = workers.Task(fn, *args)
+        task.signals.progress.connect(self.progress_bar.setValue)
+        task.signals.finished.connect(on_finished)
+        task.signals.failed.connect(
+            lambda message: QMessageBox.critical(self, 'Ошибка', f'{error_text}:\n{message}'))
+        task.signals.cancelled.connect(lambda: self.status_label.setText('Операция отменена'))
+        for signal in (task.signals.finished, task.signals.failed, task.signals.cancelled):
+            signal.connect(lambda *_, task=task: self.on_task_done(task))
+
+        self.active_tasks.append(task)
         self.progress_bar.setValue(0)
-        QApplication.processEvents()
-
-        try:
-            self.current_file_path = file_path
-            file_name = os.path.basename(file_path)
-            file_size = os.path.getsize(file_path) / 1024  # KB
-            self.file_info_label.setText(f"Файл: {file_name}\nРазмер: {file_size:.1f} KB")
-
-            if file_path.lower().endswith('.docx'):
-                self.questions = self.load_docx_file(file_path)
-            else:
-                self.questions = self.load_txt_file(file_path)
-
-            self.progress_bar.setValue(50)
-            QApplication.processEvents()
-
-            self.status_label.setText(f'Загружено {len(self.questions)} вопросов из файла: {file_name}')
-            self.questions_info_label.setText(f'Вопросов: {len(self.questions)}')
-
-            self.show_preview()
-
-            self.split_btn.setEnabled(True)
-            self.random_split_btn.setEnabled(True)
-
-            self.progress_bar.setValue(100)
-            QMessageBox.information(self, 'Успех',
-                                    f'Загружено {len(self.questions)} вопросов')
+        self.progress_bar.setVisible(True)
+        self.cancel_btn.setVisible(True)
+        self.thread_pool.start(task)
 
-        except Exception as e:
-            QMessageBox.critical(self, 'Ошибка', f'Ошибка при загрузке файла:\n{str(e)}')
-        finally:
+    def on_task_done(self, task):
+        if task in self.active_tasks:
+            self.active_tasks.remove(task)
+        if not self.active_tasks:
             self.progress_bar.setVisible(False)
+            self.cancel_btn.setVisible(False)
+        self.diagnostics_panel.refresh()
 
-    def load_txt_file(self, file_path):
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        questions = []
-        lines = content.splitlines()
+    def cancel_tasks(self):
+        self.pending_split = None
+        for task in self.active_tasks:
+            task.cancel()
 
-        for line in lines:
-            line = line.strip()
-            if line:
-                questions.append(line)
-
-        return questions
-
-    def load_docx_file(self, file_path):
-        """Загружает вопросы из DOCX файла"""
-        if not HAS_DOCX:
-            QMessageBox.warning(self, 'Ошибка',
-                                'Библиотека python-docx не установлена. Установите:\n'
-                                'pip install python-docx')
-            return []
-
-        try:
-            doc = docx.Document(file_path)
-            questions = []
-
-            for paragraph in doc.paragraphs:
-                text = paragraph.text.strip()
-                if text:
-                    questions.append(text)
-
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        text = cell.text.strip()
-                        if text:
-                            questions.append(text)
+    def load_file(self, file_path):
+        self.pending_split = None
+        self.status_label.setText(f'Загрузка файла: {os.path.basename(file_path)}')
+        self.start_task(workers.load_questions_task, (file_path,),
+                        lambda result: self.on_file_loaded(file_path, result),
+                        'Ошибка при загрузке файла')
+
+    def on_file_loaded(self, file_path, result):
+        self.current_file_path = file_path
+        self.questions, self.question_numbers, self.questions_hash, cache_hit = result
+        self.duplicate_clusters = None
+        file_name = os.path.basename(file_path)
+        file_size = os.path.getsize(file_path) / 1024  # KB
+        self.file_info_label.setText(f"Файл: {file_name}\nРазмер: {file_size:.1f} KB")
+
+        source = 'кэш' if cache_hit else 'файл разобран заново'
+        self.status_label.setText(f'Загружено {len(self.questions)} вопросов из файла: {file_name} ({source})')
+        self.questions_info_label.setText(f'Вопросов: {len(self.questions)}')
+
+        self.show_preview()
+
+        self.split_btn.setEnabled(True)
+        self.random_split_btn.setEnabled(True)
+        self.cost_split_btn.setEnabled(True)
+        self.weighted_split_btn.setEnabled(True)
+        self.restore_btn.setEnabled(True)
+
+        # Повторы ищутся отдельной задачей: её можно отменить, а вопросы
+        # уже видны в предпросмотре
+        if self.group_duplicates_check.isChecked():
+            self.find_duplicates()
+
+        QMessageBox.information(self, 'Успех',
+                                f'Загружено {len(self.questions)} вопросов')
+
+    def on_group_duplicates_toggled(self, checked):
+        if checked and self.questions and self.duplicate_clusters is None:
+            self.find_duplicates()
+
+    def find_duplicates(self):
+        if any(task.fn is workers.duplicates_task for task in self.active_tasks):
+            return
+        self.start_task(workers.duplicates_task, (self.questions, self.questions_hash),
+                        self.on_duplicates_found, 'Ошибка при поиске повторов')
 
-            return questions
+    def on_duplicates_found(self, result):
+        questions, clusters, cache_hit = result
+        # Пока шёл поиск, мог загрузиться другой файл
+        if questions is not self.questions:
+            return
+        self.duplicate_clusters = clusters
+        self.preview_model.set_questions(self.questions, clusters)
+        self.duplicate_rows = sorted(self.preview_model.duplicate_of)
+        self.update_preview_info()
 
-        except Exception as e:
-            QMessageBox.critical(self, 'Ошибка', f'Ошибка при чтении DOCX файла:\n{str(e)}')
-            return []
+        if self.pending_split is not None:
+            mode, limits = self.pending_split
+            self.pending_split = None
+            self.start_split(mode, limits)
 
+    @profiled('show_preview')
     def show_preview(self):
-        if not self.questions:
-            self.preview_text.clear()
+        """Список строит строки только для видимых вопросов, поэтому файл
+        любого размера показывается целиком"""
+        self.search_index = None
+        self.preview_model.set_questions(self.questions, self.duplicate_clusters)
+        self.duplicate_rows = sorted(self.preview_model.duplicate_of)
+        self.update_preview_info()
+
+    def update_preview_info(self):
+        info = f'Всего вопросов: {len(self.questions)}'
+        if self.duplicate_clusters:
+            info += f', групп повторов: {len(self.duplicate_clusters)} (подсвечены)'
+        self.preview_info_label.setText(info)
+        self.next_duplicate_btn.setEnabled(bool(self.duplicate_rows))
+
+    def select_preview_row(self, row):
+        index = self.preview_model.index(row)
+        self.preview_list.setCurrentIndex(index)
+        self.preview_list.scrollTo(index, QAbstractItemView.PositionAtCenter)
+
+    def find_next(self):
+        query = self.search_edit.text()
+        if not query.strip() or not self.questions:
             return
 
-        preview_text = f"Всего вопросов: {len(self.questions)}\n\n"
-        preview_text += "Первые 25 вопросов (с сохраненной нумерацией):\n"
-
-        for i, question in enumerate(self.questions[:25], 1):
-            display_text = question[:100] + ("..." if len(question) > 100 else "")
-            preview_text += f"{display_text}\n"
-
-        if len(self.questions) > 25:
-            preview_text += f"\n... и еще {len(self.questions) - 25} вопросов"
-
-        self.preview_text.setText(preview_text)
-
-    def split_questions(self):
-        if not self.questions:
-            QMessageBox.warning(self, 'Предупреждение', 'Сначала загрузите вопросы')
+        if self.search_index is None:
+            # Индекс строится один раз в фоне, поиск продолжится, когда он будет готов
+            if not any(task.fn is workers.search_index_task for task in self.active_tasks):
+                self.status_label.setText('Построение индекса поиска...')
+                self.start_task(workers.search_index_task, (self.questions, self.question_numbers),
+                                self.on_search_index_ready, 'Ошибка при построении индекса поиска')
             return
 
-        if not self.persons:
-            QMessageBox.warning(self, 'Предупреждение', 'Добавьте хотя бы одного человека')
+        current = self.preview_list.currentIndex()
+        start_row = current.row() + 1 if current.isValid() else 0
+        row = self.search_index.find(query, start_row)
+        if row == -1:
+            self.status_label.setText(f'Не найдено: {query}')
             return
+        self.status_label.setText(f'Найдено в строке {row + 1}')
+        self.select_preview_row(row)
+
+    def on_search_index_ready(self, result):
+        questions, search_index = result
+        # Пока строился индекс, мог загрузиться другой файл
+        if questions is self.questions:
+            self.search_index = search_index
+            self.find_next()
+
+    def next_duplicate(self):
+        if not self.duplicate_rows:
+            return
+        current = self.preview_list.currentIndex()
+        position = bisect_right(self.duplicate_rows, current.row() if current.isValid() else -1)
+        self.select_preview_row(self.duplicate_rows[position % len(self.duplicate_rows)])
 
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setValue(0)
-        QApplication.processEvents()
-
-        distribution = {person: [] for person in self.persons}
-
-        num_persons = len(self.persons)
-        for_one_person = len(self.questions) // num_persons
-        remainder = len(self.questions) % num_persons
-
-        self.progress_bar.setValue(30)
-        QApplication.processEvents()
-
-        for i, person in enumerate(self.persons):
-            start_idx = for_one_person * i
-            end_idx = for_one_person * (i + 1)
-            distribution[person] = self.questions[start_idx:end_idx]
-
-        self.progress_bar.setValue(70)
-        QApplication.processEvents()
+    def split_questions(self):
+        self.start_split('even')
 
-        if remainder > 0:
-            start_remainder = for_one_person * num_persons
-            remaining_questions = self.questions[start_remainder:]
-            for i, question in enumerate(remaining_questions):
-                person = self.persons[i % num_persons]
-                distribution[person].append(question)
+    def split_questions_randomly(self):
+        self.start_split('random')
 
-        self.persons_distribution = distribution
-        self.progress_bar.setValue(90)
-        QApplication.processEvents()
+    def split_questions_by_cost(self):
+        self.start_split('cost')
 
-        self.display_results()
-        self.save_btn.setEnabled(True)
+    def split_questions_weighted(self):
+        dialog = PersonLimitsDialog(self.persons, self.person_limits, self)
+        if dialog.exec_() != QDialog.Accepted:
+            return
 
-        self.progress_bar.setValue(100)
-        self.progress_bar.setVisible(False)
+        self.person_limits.update(dialog.get_limits())
+        limits = [self.person_limits[person] for person in self.persons]
+        self.start_split('weighted', list(zip(*limits)) if limits else None)
 
-    def split_questions_randomly(self):
+    def start_split(self, mode, limits=None):
         if not self.questions:
             QMessageBox.warning(self, 'Предупреждение', 'Сначала загрузите вопросы')
             return
@@ -423,73 +755,72 @@ class QuestionSplitterApp(QMainWindow):
             QMessageBox.warning(self, 'Предупреждение', 'Добавьте хотя бы одного человека')
             return
 
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setValue(0)
-        QApplication.processEvents()
-
-        distribution = {person: [] for person in self.persons}
-
-        num_persons = len(self.persons)
-        for_one_person = len(self.questions) // num_persons
-
-        shuffled_questions = self.questions.copy()
-        random.shuffle(shuffled_questions)
+        # Случайное распределение всегда получает seed, чтобы его можно было
+        # повторить; для весов seed включает перемешивание, только если задан
+        seed = int(self.seed_edit.text()) if self.seed_edit.text() else None
+        if mode == 'random' and seed is None:
+            seed = random.randrange(2147483648)
+        elif mode not in ('random', 'weighted'):
+            seed = None
+
+        clusters = None
+        if self.group_duplicates_check.isChecked():
+            # Флажок включили после загрузки или поиск ещё идёт: распределение
+            # начнётся, когда повторы будут найдены
+            if self.duplicate_clusters is None:
+                self.pending_split = (mode, limits)
+                self.status_label.setText('Поиск повторов...')
+                self.find_duplicates()
+                return
+            clusters = self.duplicate_clusters
+        self.start_task(workers.split_task, (mode, self.questions, list(self.persons),
+                                                self.question_numbers, limits, clusters,
+                                                seed, self.questions_hash),
+                        self.on_split_finished, 'Ошибка при распределении')
+
+    def on_split_finished(self, result):
+        self.distribution, self.persons_distribution, self.split_record = result
+        self.display_results()
+        if self.split_record.seed is not None:
+            self.status_label.setText(f'{self.status_label.text()}, seed {self.split_record.seed}')
+        self.save_btn.setEnabled(True)
 
-        self.progress_bar.setValue(30)
-        QApplication.processEvents()
+    def on_rebalance_finished(self, result):
+        self.distribution, self.persons_distribution, self.split_record, moved = result
+        self.display_results()
+        self.status_label.setText(f'{self.status_label.text()}. Перемещено вопросов: {moved}')
 
-        for i, question in enumerate(shuffled_questions):
-            person = min(distribution.keys(), key=lambda p: len(distribution[p]))
-            distribution[person].append(question)
-            if i % 10 == 0:
-                progress = 30 + (i / len(shuffled_questions)) * 60
-                self.progress_bar.setValue(int(progress))
-                QApplication.processEvents()
+    def restore_split_dialog(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Выберите запись распределения",
+            os.path.dirname(self.current_file_path),
+            f"Записи распределения (*{RECORD_SUFFIX});;Все файлы (*.*)"
+        )
 
-        self.persons_distribution = distribution
-        self.progress_bar.setValue(90)
-        QApplication.processEvents()
+        if file_path:
+            self.start_task(workers.restore_task,
+                            (file_path, self.questions, self.question_numbers, self.questions_hash),
+                            self.on_restore_finished, 'Ошибка при восстановлении распределения')
 
+    def on_restore_finished(self, result):
+        self.distribution, self.persons_distribution, self.split_record = result
+        self.persons = list(self.split_record.persons)
+        self.update_persons_info()
         self.display_results()
+        self.status_label.setText(f'{self.status_label.text()} (восстановлено по записи)')
         self.save_btn.setEnabled(True)
 
-        self.progress_bar.setValue(100)
-        self.progress_bar.setVisible(False)
-
+    @profiled('display_results')
     def display_results(self):
-        self.table.setRowCount(len(self.persons_distribution))
+        self.results_model.set_distribution(self.persons_distribution)
 
-        total_questions = 0
-        row = 0
+        counts = [len(q) for q in self.persons_distribution.values()]
+        total_questions = sum(counts)
+        min_q = min(counts)
+        max_q = max(counts)
 
-        for person, questions in self.persons_distribution.items():
-            name_item = QTableWidgetItem(person)
-            name_item.setFlags(name_item.flags() ^ Qt.ItemIsEditable)
-            name_item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 0, name_item)
-
-            count = len(questions)
-            count_item = QTableWidgetItem(str(count))
-            count_item.setFlags(count_item.flags() ^ Qt.ItemIsEditable)
-            count_item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 1, count_item)
-
-            # Сортируем вопросы по номеру для отображения в таблице
-            sorted_questions = sorted(questions, key=lambda q: self.extract_question_number(q))
-            questions_text = "\n".join(sorted_questions)
-            questions_item = QTableWidgetItem(questions_text)
-            questions_item.setFlags(questions_item.flags() ^ Qt.ItemIsEditable)
-            self.table.setItem(row, 2, questions_item)
-
-            total_questions += count
-            row += 1
-
-        self.table.resizeRowsToContents()
-
-        min_q = min(len(q) for q in self.persons_distribution.values())
-        max_q = max(len(q) for q in self.persons_distribution.values())
-
-        distribution_info = f"Распределено {total_questions} вопросов между {len(self.persons)} людьми"
+        distribution_info = f"Распределено {total_questions} вопросов между {len(self.persons_distribution)} людьми"
         if min_q != max_q:
             distribution_info += f" (от {min_q} до {max_q} на человека)"
         else:
@@ -500,23 +831,19 @@ class QuestionSplitterApp(QMainWindow):
 
         self.highlight_extremes()
 
+    @profiled('highlight_extremes')
     def highlight_extremes(self):
-        min_q = min(len(q) for q in self.persons_distribution.values())
-        max_q = max(len(q) for q in self.persons_distribution.values())
-
-        for row in range(self.table.rowCount()):
-            person = self.table.item(row, 0).text()
-            count = len(self.persons_distribution[person])
-
-            if count == min_q and min_q != max_q:
-                for col in range(3):
-                    self.table.item(row, col).setBackground(QColor(200, 255, 200))
-            elif count == max_q and min_q != max_q:
-                for col in range(3):
-                    self.table.item(row, col).setBackground(QColor(255, 200, 200))
-            else:
-                for col in range(3):
-                    self.table.item(row, col).setBackground(QColor(255, 255, 255))
+        """Цвета строк отдаёт модель; здесь только пересчитываются min/max"""
+        self.results_model.update_extremes()
+        self.table.viewport().update()
+
+    def toggle_result_row(self, index):
+        row = index.row()
+        self.results_model.toggle_expanded(row)
+        if self.results_model.is_expanded(row):
+            self.table.resizeRowToContents(row)
+        else:
+            self.table.verticalHeader().resizeSection(row, self.collapsed_row_height)
 
     def save_results(self):
         """Сохраняет результаты в файл DOCX с цветным оформлением"""
@@ -527,12 +854,18 @@ class QuestionSplitterApp(QMainWindow):
         # Определяем расширение файла и фильтры
         if not self.current_file_path:
             default_name = "results.docx"
-            file_filter = "Документы Word (*.docx);;Текстовые файлы (*.txt);;Все файлы (*.*)"
+            file_filter = ("Документы Word (*.docx);;Текстовые файлы (*.txt);;"
+                           "Текстовые файлы, сжатые gzip (*.txt.gz);;"
+                           "CSV (*.csv);;JSON Lines (*.jsonl);;"
+                           f"Запись распределения (*{RECORD_SUFFIX});;Все файлы (*.*)")
         else:
             file_dir = os.path.dirname(self.current_file_path)
             file_name = os.path.splitext(os.path.basename(self.current_file_path))[0]
             default_name = os.path.join(file_dir, f"{file_name}_results.docx")
-            file_filter = "Документы Word (*.docx);;Текстовые файлы (*.txt);;Все файлы (*.*)"
+            file_filter = ("Документы Word (*.docx);;Текстовые файлы (*.txt);;"
+                           "Текстовые файлы, сжатые gzip (*.txt.gz);;"
+                           "CSV (*.csv);;JSON Lines (*.jsonl);;"
+                           f"Запись распределения (*{RECORD_SUFFIX});;Все файлы (*.*)")
 
         save_path, selected_filter = QFileDialog.getSaveFileName(
             self,
@@ -544,154 +877,29 @@ class QuestionSplitterApp(QMainWindow):
         if not save_path:
             return
 
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setValue(0)
-        QApplication.processEvents()
-
-        try:
-            # Определяем формат сохранения по расширению файла
-            if save_path.lower().endswith('.docx'):
-                if not HAS_DOCX:
-                    QMessageBox.warning(self, 'Предупреждение',
-                                        'Для сохранения в DOCX установите библиотеку python-docx\n'
-                                        'pip install python-docx\n\n'
-                                        'Результаты будут сохранены в TXT формате.')
-                    save_path = save_path.replace('.docx', '.txt')
-                    self.save_as_txt(save_path)
-                else:
-                    self.save_as_docx(save_path)
-            else:
-                self.save_as_txt(save_path)
-
-            self.progress_bar.setValue(100)
-            QMessageBox.information(self, 'Успех',
-                                    f'Результаты сохранены в файл:\n{save_path}')
-
-        except Exception as e:
-            QMessageBox.critical(self, 'Ошибка', f'Ошибка при сохранении:\n{str(e)}')
-        finally:
-            self.progress_bar.setVisible(False)
+        # Запись распределения маленькая: параметры и, если нужно, упакованные назначения
+        if save_path.lower().endswith(RECORD_SUFFIX):
+            try:
+                self.split_record.save(save_path)
+            except OSError as e:
+                QMessageBox.critical(self, 'Ошибка', f'Ошибка при сохранении:\n{e}')
+                return
+            QMessageBox.information(self, 'Успех', f'Запись распределения сохранена в файл:\n{save_path}')
+            return
 
-    def save_as_docx(self, file_path):
-        from docx import Document
-        from docx.shared import Pt, Inches, RGBColor
-        from docx.enum.text import WD_ALIGN_PARAGRAPH
-        from docx.enum.style import WD_STYLE_TYPE
-
-        doc = Document()
-
-        styles = doc.styles
-
-        title_style = styles.add_style('CustomTitle', WD_STYLE_TYPE.PARAGRAPH)
-        title_font = title_style.font
-        title_font.name = 'Arial'
-        title_font.size = Pt(16)
-        title_font.bold = True
-        title_style.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-        subtitle_style = styles.add_style('CustomSubtitle', WD_STYLE_TYPE.PARAGRAPH)
-        subtitle_font = subtitle_style.font
-        subtitle_font.name = 'Arial'
-        subtitle_font.size = Pt(12)
-        subtitle_font.bold = True
-        subtitle_style.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-        name_style = styles.add_style('CustomName', WD_STYLE_TYPE.PARAGRAPH)
-        name_font = name_style.font
-        name_font.name = 'Arial'
-        name_font.size = Pt(12)
-        name_font.bold = True
-
-        question_style = styles.add_style('CustomQuestion', WD_STYLE_TYPE.PARAGRAPH)
-        question_font = question_style.font
-        question_font.name = 'Arial'
-        question_font.size = Pt(11)
-
-        colors = [
-            RGBColor(0, 112, 192),  # Синий
-            RGBColor(237, 125, 49),  # Оранжевый
-            RGBColor(112, 173, 71),  # Зеленый
-            RGBColor(255, 192, 0),  # Золотой
-            RGBColor(155, 0, 211),  # Фиолетовый
-            RGBColor(255, 0, 0),  # Красный
-            RGBColor(0, 176, 240),  # Голубой
-            RGBColor(146, 208, 80),  # Светло-зеленый
-            RGBColor(192, 0, 0),  # Темно-красный
-            RGBColor(0, 176, 80),  # Изумрудный
-            RGBColor(112, 48, 160),  # Пурпурный
-            RGBColor(255, 140, 0),  # Темно-оранжевый
-        ]
-
-        title = doc.add_paragraph('РЕЗУЛЬТАТЫ РАСПРЕДЕЛЕНИЯ ВОПРОСОВ', style='CustomTitle')
-
-        total_questions = sum(len(q) for q in self.persons_distribution.values())
-        subtitle_text = f"Всего вопросов: {total_questions} | Количество людей: {len(self.persons_distribution)}"
-        doc.add_paragraph(subtitle_text, style='CustomSubtitle')
-
-        persons_list = list(self.persons_distribution.keys())
-
-        for i, (person, questions) in enumerate(self.persons_distribution.items()):
-            doc.add_paragraph('—' * 39)
-            color = colors[i % len(colors)]
-
-            name_para = doc.add_paragraph()
-            name_run = name_para.add_run(f"{person} [{len(questions)} вопросов]")
-            name_run.font.color.rgb = color
-            name_run.font.bold = True
-            name_run.font.size = Pt(12)
-
-            doc.add_paragraph('—' * 39)
-
-            sorted_questions = sorted(questions, key=lambda q: self.extract_question_number(q))
-
-            for j, question in enumerate(sorted_questions, 1):
-                question_para = doc.add_paragraph(style='CustomQuestion')
-                text_run = question_para.add_run(question)
-                question_para.paragraph_format.left_indent = Inches(0.2)
-                question_para.paragraph_format.space_after = Pt(6)
-
-            doc.add_paragraph()
-
-        doc.add_page_break()
-        summary_title = doc.add_paragraph('СВОДНАЯ ТАБЛИЦА РАСПРЕДЕЛЕНИЯ', style='CustomTitle')
-
-        table = doc.add_table(rows=len(persons_list) + 1, cols=3)
-        table.style = 'Light Shading'
-
-        header_cells = table.rows[0].cells
-        header_cells[0].text = '№'
-        header_cells[1].text = 'Имя'
-        header_cells[2].text = 'Количество вопросов'
-
-        for i, person in enumerate(persons_list, 1):
-            row_cells = table.rows[i].cells
-            row_cells[0].text = str(i)
-            row_cells[1].text = person
-            row_cells[2].text = str(len(self.persons_distribution[person]))
-
-            color = colors[(i - 1) % len(colors)]
-            run = row_cells[1].paragraphs[0].runs[0]
-            run.font.color.rgb = color
-
-        doc.save(file_path)
-
-    def save_as_txt(self, file_path):
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write("=" * 60 + "\n")
-            f.write(f"РЕЗУЛЬТАТЫ РАСПРЕДЕЛЕНИЯ ВОПРОСОВ\n")
-            f.write(f"Всего вопросов: {sum(len(q) for q in self.persons_distribution.values())}\n")
-            f.write(f"Количество людей: {len(self.persons_distribution)}\n")
-            f.write("=" * 60 + "\n\n")
-
-            for person, questions in self.persons_distribution.items():
-                f.write("-" * 39 + "\n")
-                f.write(f"{person} [{len(questions)} вопросов]:\n")
-                f.write("-" * 39 + "\n")
-                # Сортируем вопросы по номеру
-                sorted_questions = sorted(questions, key=lambda q: self.extract_question_number(q))
-                for question in sorted_questions:
-                    f.write(f"{question}\n")
-                f.write("\n")
+        # Определяем формат сохранения по расширению файла
+        if save_path.lower().endswith('.docx') and not HAS_DOCX:
+            QMessageBox.warning(self, 'Предупреждение',
+                                'Для сохранения в DOCX установите библиотеку python-docx\n'
+                                'pip install python-docx\n\n'
+                                'Результаты будут сохранены в TXT формате.')
+            save_path = save_path.replace('.docx', '.txt')
+
+        self.start_task(workers.save_task,
+                        (self.persons_distribution, save_path, self.distribution.numbers),
+                        lambda path: QMessageBox.information(
+                            self, 'Успех', f'Результаты сохранены в файл:\n{path}'),
+                        'Ошибка при сохранении')
 
 
 def main():
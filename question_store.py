@@ -0,0 +1,145 @@
+"""Компактное хранение вопросов без зависимости от PyQt5.
+
+Все вопросы лежат в одном UTF-8 буфере, границы - в массиве смещений.
+На вопрос уходит несколько байт служебных данных вместо отдельного
+объекта str, а строка декодируется только тогда, когда её показывают
+или записывают в файл. Распределения ссылаются на вопросы по индексам
+(QuestionView) и собственных копий текста не держат.
+"""
+from array import array
+from bisect import bisect_right
+from itertools import islice
+
+import question_loader
+
+
+class QuestionStore:
+    """Последовательность вопросов: общий буфер и смещения начала каждого"""
+
+    __slots__ = ('buffer', 'offsets')
+
+    def __init__(self, buffer=b'', offsets=None):
+        self.buffer = buffer
+        self.offsets = offsets if offsets is not None else array('q', [0])
+
+    @classmethod
+    def from_questions(cls, questions):
+        """Собирает хранилище одним проходом по итерируемому набору строк"""
+        buffer = bytearray()
+        offsets = array('q', [0])
+        for question in questions:
+            buffer += question.encode('utf-8')
+            offsets.append(len(buffer))
+        return cls(bytes(buffer), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('Индекс вопроса вне диапазона')
+        offsets = self.offsets
+        return self.buffer[offsets[index]:offsets[index + 1]].decode('utf-8')
+
+    def __iter__(self):
+        buffer = self.buffer
+        start = 0
+        for end in islice(self.offsets, 1, None):
+            yield buffer[start:end].decode('utf-8')
+            start = end
+
+    @property
+    def nbytes(self):
+        """Объём буфера и смещений в байтах"""
+        return len(self.buffer) + self.offsets.itemsize * len(self.offsets)
+
+
+class QuestionView:
+    """Вопросы одного человека: индексы в общем хранилище, текст по запросу"""
+
+    __slots__ = ('questions', 'indices')
+
+    def __init__(self, questions, indices):
+        self.questions = questions
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            questions = self.questions
+            return [questions[i] for i in self.indices[index]]
+        return self.questions[self.indices[index]]
+
+    def __iter__(self):
+        questions = self.questions
+        for i in self.indices:
+            yield questions[i]
+
+
+class SearchIndex:
+    """Поиск по всем вопросам без перебора строк в Python.
+
+    Тексты в нижнем регистре склеены в одну строку (переводы строк внутри
+    вопроса заменены пробелами), начала вопросов лежат в массиве: подстрока
+    ищется str.find, а вопрос по найденной позиции - бинарным поиском.
+    Номера вопросов ищутся по словарю.
+    """
+
+    __slots__ = ('text', 'starts', 'rows_by_number')
+
+    def __init__(self, questions, numbers=None):
+        parts = []
+        starts = array('q')
+        position = 0
+        for question in questions:
+            text = question.lower().replace('\n', ' ')
+            parts.append(text)
+            starts.append(position)
+            position += len(text) + 1
+        self.text = '\n'.join(parts)
+        self.starts = starts
+
+        self.rows_by_number = {}
+        if numbers is not None:
+            for row, number in enumerate(numbers):
+                if number:
+                    self.rows_by_number.setdefault(number, row)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def find(self, query, start_row=0):
+        """Первый вопрос с query начиная со start_row (по кругу) или -1.
+
+        Запрос вида «#12» ищет вопрос с номером 12.
+        """
+        query = query.strip().lower()
+        if query.startswith('#') and query[1:].isdigit():
+            return self.rows_by_number.get(int(query[1:]), -1)
+        if not query:
+            return -1
+
+        query = query.replace('\n', ' ')
+        row = self._find_from(query, start_row)
+        if row == -1 and start_row > 0:
+            row = self._find_from(query, 0)
+        return row
+
+    def _find_from(self, query, start_row):
+        if start_row >= len(self.starts):
+            return -1
+        position = self.text.find(query, self.starts[start_row])
+        if position == -1:
+            return -1
+        return bisect_right(self.starts, position) - 1
+
+
+def load_question_store(file_path, progress=None):
+    """Загружает вопросы из файла сразу в хранилище, без промежуточного списка"""
+    return QuestionStore.from_questions(question_loader.iter_questions(file_path, progress))
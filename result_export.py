@@ -0,0 +1,365 @@
+"""Сохранение результатов распределения в DOCX и TXT без зависимости от PyQt5.
+
+Вопросы каждого человека записываются в том порядке, в котором они лежат
+в persons_distribution: Distribution.as_dict() отдаёт их уже
+отсортированными по номеру. Вместо списков там QuestionView, так что текст
+вопроса декодируется из общего хранилища только в момент записи.
+
+python-docx импортируется только при первом сохранении в DOCX: на импорт
+пакета (lxml и десятки модулей docx) уходит заметная часть запуска окна.
+
+TXT, CSV и JSON Lines пишутся потоково за один проход по распределению,
+поэтому память не зависит от его размера; путь *.gz сжимается gzip, путь
+«-» означает stdout. save_sharded пишет по файлу на человека. Номера
+вопросов для CSV и JSON Lines берутся из Distribution.numbers (параметр
+numbers), текст заново не разбирается.
+"""
+import csv
+import gzip
+import io
+import json
+import os
+import re
+import sys
+from contextlib import contextmanager
+from importlib.util import find_spec
+
+from split_engine import extract_question_number
+
+
+HAS_DOCX = find_spec('docx') is not None
+if not HAS_DOCX:
+    # В stderr: stdout может быть занят результатами (save_as_txt в «-»)
+    print("Библиотека python-docx не установлена. Сохранение в DOCX не будет поддерживаться.",
+          file=sys.stderr)
+
+
+SEPARATOR = '—' * 39
+STDOUT_PATH = '-'
+EXPORT_FORMATS = ('docx', 'txt', 'txt.gz', 'csv', 'csv.gz', 'jsonl', 'jsonl.gz')
+CSV_HEADER = ('person', 'number', 'question')
+MAX_SHARD_NAME_LENGTH = 100
+WRITE_CHUNK_CHARS = 1024 * 1024
+GZIP_LEVEL = 6
+
+_UNSAFE_FILE_NAME_RE = re.compile(r'[\x00-\x1f<>:"/\\|?*]')
+
+
+def escape(text):
+    """Экранирование &, < и > для XML (xml.sax.saxutils тянет за собой urllib)"""
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _xml_text(text):
+    """Текст для <w:t>: экранирование, табуляции и переводы строк как в python-docx"""
+    return (escape(text).replace('\t', '</w:t><w:tab/><w:t xml:space="preserve">')
+            .replace('\n', '</w:t><w:br/><w:t xml:space="preserve">'))
+
+
+def _build_questions_xml(persons_distribution, colors, question_style_id):
+    """Собирает тело документа со списками вопросов одной XML-строкой.
+
+    Создание каждого абзаца через python-docx (add_paragraph -> add_run ->
+    paragraph_format) на десятках тысяч вопросов занимает десятки секунд,
+    поэтому абзацы пишутся напрямую, а отступы берутся из стиля.
+    """
+    separator_xml = f'<w:p><w:r><w:t>{SEPARATOR}</w:t></w:r></w:p>'
+    question_open = (f'<w:p><w:pPr><w:pStyle w:val="{question_style_id}"/></w:pPr>'
+                     f'<w:r><w:t xml:space="preserve">')
+    question_close = '</w:t></w:r></w:p>'
+
+    parts = []
+    for i, (person, questions) in enumerate(persons_distribution.items()):
+        color = colors[i % len(colors)]
+        parts.append(separator_xml)
+        parts.append(f'<w:p><w:r><w:rPr><w:b/><w:color w:val="{color}"/><w:sz w:val="24"/></w:rPr>'
+                     f'<w:t xml:space="preserve">{_xml_text(f"{person} [{len(questions)} вопросов]")}'
+                     f'</w:t></w:r></w:p>')
+        parts.append(separator_xml)
+        for question in questions:
+            parts.append(question_open)
+            parts.append(_xml_text(question))
+            parts.append(question_close)
+        parts.append('<w:p/>')
+
+    return ''.join(parts)
+
+
+def save_as_docx(persons_distribution, file_path):
+    """Сохраняет распределение в DOCX с цветным оформлением"""
+    from docx import Document
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import nsdecls
+    from docx.shared import Pt, Inches, RGBColor
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.enum.style import WD_STYLE_TYPE
+
+    doc = Document()
+
+    styles = doc.styles
+
+    title_style = styles.add_style('CustomTitle', WD_STYLE_TYPE.PARAGRAPH)
+    title_font = title_style.font
+    title_font.name = 'Arial'
+    title_font.size = Pt(16)
+    title_font.bold = True
+    title_style.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    subtitle_style = styles.add_style('CustomSubtitle', WD_STYLE_TYPE.PARAGRAPH)
+    subtitle_font = subtitle_style.font
+    subtitle_font.name = 'Arial'
+    subtitle_font.size = Pt(12)
+    subtitle_font.bold = True
+    subtitle_style.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    name_style = styles.add_style('CustomName', WD_STYLE_TYPE.PARAGRAPH)
+    name_font = name_style.font
+    name_font.name = 'Arial'
+    name_font.size = Pt(12)
+    name_font.bold = True
+
+    question_style = styles.add_style('CustomQuestion', WD_STYLE_TYPE.PARAGRAPH)
+    question_font = question_style.font
+    question_font.name = 'Arial'
+    question_font.size = Pt(11)
+    question_style.paragraph_format.left_indent = Inches(0.2)
+    question_style.paragraph_format.space_after = Pt(6)
+
+    colors = [
+        RGBColor(0, 112, 192),  # Синий
+        RGBColor(237, 125, 49),  # Оранжевый
+        RGBColor(112, 173, 71),  # Зеленый
+        RGBColor(255, 192, 0),  # Золотой
+        RGBColor(155, 0, 211),  # Фиолетовый
+        RGBColor(255, 0, 0),  # Красный
+        RGBColor(0, 176, 240),  # Голубой
+        RGBColor(146, 208, 80),  # Светло-зеленый
+        RGBColor(192, 0, 0),  # Темно-красный
+        RGBColor(0, 176, 80),  # Изумрудный
+        RGBColor(112, 48, 160),  # Пурпурный
+        RGBColor(255, 140, 0),  # Темно-оранжевый
+    ]
+
+    title = doc.add_paragraph('РЕЗУЛЬТАТЫ РАСПРЕДЕЛЕНИЯ ВОПРОСОВ', style='CustomTitle')
+
+    total_questions = sum(len(q) for q in persons_distribution.values())
+    subtitle_text = f"Всего вопросов: {total_questions} | Количество людей: {len(persons_distribution)}"
+    doc.add_paragraph(subtitle_text, style='CustomSubtitle')
+
+    persons_list = list(persons_distribution.keys())
+
+    body_xml = _build_questions_xml(persons_distribution, colors, question_style.style_id)
+    body = doc.element.body
+    for element in list(parse_xml(f'<w:body {nsdecls("w")}>{body_xml}</w:body>')):
+        body.sectPr.addprevious(element)
+
+    doc.add_page_break()
+    summary_title = doc.add_paragraph('СВОДНАЯ ТАБЛИЦА РАСПРЕДЕЛЕНИЯ', style='CustomTitle')
+
+    table = doc.add_table(rows=len(persons_list) + 1, cols=3)
+    table.style = 'Light Shading'
+
+    header_cells = table.rows[0].cells
+    header_cells[0].text = '№'
+    header_cells[1].text = 'Имя'
+    header_cells[2].text = 'Количество вопросов'
+
+    for i, person in enumerate(persons_list, 1):
+        row_cells = table.rows[i].cells
+        row_cells[0].text = str(i)
+        row_cells[1].text = person
+        row_cells[2].text = str(len(persons_distribution[person]))
+
+        color = colors[(i - 1) % len(colors)]
+        run = row_cells[1].paragraphs[0].runs[0]
+        run.font.color.rgb = color
+
+    doc.save(file_path)
+
+
+@contextmanager
+def open_text_output(file_path, newline=None):
+    """Текстовый поток UTF-8 для записи: «-» - stdout, *.gz - файл со сжатием gzip"""
+    if file_path == STDOUT_PATH:
+        sys.stdout.flush()
+        stream = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', newline=newline)
+        try:
+            yield stream
+        finally:
+            # sys.stdout остаётся открытым
+            stream.flush()
+            stream.detach()
+    elif file_path.lower().endswith('.gz'):
+        with gzip.open(file_path, 'wt', encoding='utf-8', newline=newline,
+                       compresslevel=GZIP_LEVEL) as f:
+            yield f
+    else:
+        with open(file_path, 'w', encoding='utf-8', newline=newline) as f:
+            yield f
+
+
+def export_format(file_path):
+    """Формат по расширению пути или имени формата (без .gz): docx, csv, jsonl
+    или txt для остальных"""
+    name = file_path.lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    extension = name.rsplit('.', 1)[-1]
+    return extension if extension in ('docx', 'csv', 'jsonl') else 'txt'
+
+
+def _write_lines(lines, stream):
+    """Пишет строки в поток кусками примерно по WRITE_CHUNK_CHARS символов"""
+    batch = []
+    size = 0
+    for line in lines:
+        batch.append(line)
+        size += len(line) + 1
+        if size >= WRITE_CHUNK_CHARS:
+            batch.append('')
+            stream.write('\n'.join(batch))
+            batch = []
+            size = 0
+    if batch:
+        batch.append('')
+        stream.write('\n'.join(batch))
+
+
+def _person_txt_lines(person, questions):
+    yield "-" * 39
+    yield f"{person} [{len(questions)} вопросов]:"
+    yield "-" * 39
+    yield from questions
+    yield ""
+
+
+def _txt_lines(persons_distribution):
+    yield "=" * 60
+    yield "РЕЗУЛЬТАТЫ РАСПРЕДЕЛЕНИЯ ВОПРОСОВ"
+    yield f"Всего вопросов: {sum(len(q) for q in persons_distribution.values())}"
+    yield f"Количество людей: {len(persons_distribution)}"
+    yield "=" * 60
+    yield ""
+
+    for person, questions in persons_distribution.items():
+        yield from _person_txt_lines(person, questions)
+
+
+def write_txt(persons_distribution, stream):
+    """Пишет TXT в поток одним проходом по распределению"""
+    _write_lines(_txt_lines(persons_distribution), stream)
+
+
+def _question_rows(persons_distribution, numbers=None):
+    """(человек, номер вопроса или None, текст) по всем вопросам.
+
+    numbers - Distribution.numbers; тогда вопросы в persons_distribution -
+    QuestionView, и номер берётся по индексу вопроса. Без numbers номер
+    разбирается из текста.
+    """
+    for person, questions in persons_distribution.items():
+        if numbers is None:
+            for question in questions:
+                yield person, extract_question_number(question) or None, question
+        else:
+            for index, question in zip(questions.indices, questions):
+                yield person, numbers[index] or None, question
+
+
+def write_csv(persons_distribution, stream, numbers=None):
+    """CSV с колонками person, number, question; stream открыт с newline=''"""
+    writer = csv.writer(stream)
+    writer.writerow(CSV_HEADER)
+    writer.writerows((person, '' if number is None else number, question)
+                     for person, number, question
+                     in _question_rows(persons_distribution, numbers))
+
+
+def write_jsonl(persons_distribution, stream, numbers=None):
+    """JSON Lines: объект {"person", "number", "question"} на строку"""
+    dumps = json.JSONEncoder(ensure_ascii=False).encode
+    _write_lines((dumps({'person': person, 'number': number, 'question': question})
+                  for person, number, question in _question_rows(persons_distribution, numbers)),
+                 stream)
+
+
+def save_as_txt(persons_distribution, file_path, numbers=None):
+    """Сохраняет распределение в текстовый файл, *.gz или stdout («-»)"""
+    with open_text_output(file_path) as f:
+        write_txt(persons_distribution, f)
+
+
+def save_as_csv(persons_distribution, file_path, numbers=None):
+    with open_text_output(file_path, newline='') as f:
+        write_csv(persons_distribution, f, numbers)
+
+
+def save_as_jsonl(persons_distribution, file_path, numbers=None):
+    with open_text_output(file_path) as f:
+        write_jsonl(persons_distribution, f, numbers)
+
+
+_SAVERS = {'txt': save_as_txt, 'csv': save_as_csv, 'jsonl': save_as_jsonl}
+_WRITERS = {'csv': write_csv, 'jsonl': write_jsonl}
+
+
+def _safe_file_name(name):
+    name = _UNSAFE_FILE_NAME_RE.sub('_', name).strip(' .')
+    return name[:MAX_SHARD_NAME_LENGTH] or 'person'
+
+
+def _save_shard(person, questions, file_path, numbers=None):
+    file_format = export_format(file_path)
+    with open_text_output(file_path, newline='' if file_format == 'csv' else None) as f:
+        if file_format == 'txt':
+            _write_lines(_person_txt_lines(person, questions), f)
+        else:
+            _WRITERS[file_format]({person: questions}, f, numbers)
+
+
+def save_sharded(persons_distribution, output_dir, file_format='txt', workers=None,
+                 numbers=None):
+    """Пишет по файлу на человека в output_dir, файлы записываются параллельно.
+
+    file_format - txt, csv или jsonl, с суффиксом .gz - со сжатием; numbers -
+    как у save_results. Имена
+    файлов начинаются с порядкового номера, поэтому одинаковые после
+    замены недопустимых символов имена не совпадают. Возвращает пути файлов.
+    """
+    if file_format not in EXPORT_FORMATS or file_format == 'docx':
+        raise ValueError(f'Формат {file_format} не поддерживается для записи по людям')
+
+    # Потоки, а не процессы: вопросы лежат в общем хранилище, а сжатие gzip
+    # и запись на диск отпускают GIL
+    from concurrent.futures import ThreadPoolExecutor
+
+    os.makedirs(output_dir, exist_ok=True)
+    width = len(str(len(persons_distribution)))
+    jobs = []
+    for position, (person, questions) in enumerate(persons_distribution.items(), 1):
+        file_name = f'{position:0{width}d}_{_safe_file_name(person)}.{file_format}'
+        jobs.append((person, questions, os.path.join(output_dir, file_name)))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda job: _save_shard(*job, numbers), jobs))
+    return [file_path for _, _, file_path in jobs]
+
+
+def save_results(persons_distribution, file_path, file_format=None, numbers=None):
+    """Сохраняет результаты в формате file_format или по расширению файла
+    (см. export_format).
+
+    numbers - Distribution.numbers для номеров в CSV и JSON Lines (вопросы
+    тогда - QuestionView из Distribution.as_dict()). Если python-docx
+    недоступен, DOCX заменяется на TXT. Возвращает путь, по которому файл
+    был записан на самом деле.
+    """
+    file_format = export_format(file_format or file_path)
+    if file_format == 'docx':
+        if HAS_DOCX:
+            save_as_docx(persons_distribution, file_path)
+            return file_path
+        file_path = file_path.replace('.docx', '.txt')
+        file_format = 'txt'
+    _SAVERS[file_format](persons_distribution, file_path, numbers)
+    return file_path
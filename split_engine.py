@@ -0,0 +1,471 @@
+"""Распределение вопросов между людьми без зависимости от PyQt5.
+
+Модуль используется и окном приложения, и пакетной обработкой: здесь нет
+ни одного импорта Qt, поэтому его можно запускать без дисплея.
+
+questions может быть списком строк или question_store.QuestionStore:
+нужны только len() и доступ по индексу.
+"""
+import heapq
+import random
+import re
+from array import array
+
+from question_loader import QUESTION_NUMBER_RE
+from question_store import QuestionView
+
+
+# Явная оценка сложности в конце первой строки вопроса: «... {5}» или «... {2.5}»
+QUESTION_COST_RE = re.compile(r'\{(\d+(?:[.,]\d+)?)\}\s*$')
+# Номера хранятся в array('i'); больший номер считается равным максимуму
+MAX_QUESTION_NUMBER = 2 ** 31 - 1
+
+
+def extract_question_number(question_text):
+    """Извлекает номер вопроса из текста"""
+    match = QUESTION_NUMBER_RE.search(question_text.strip())
+    if match:
+        return int(match.group(1))
+    return 0
+
+
+def question_cost(question_text):
+    """Сложность вопроса: метка {N} в конце первой строки, иначе длина текста.
+
+    Метки в строках вариантов ответа не считаются меткой вопроса.
+    """
+    match = QUESTION_COST_RE.search(question_text.partition('\n')[0])
+    if match:
+        return float(match.group(1).replace(',', '.'))
+    return float(len(question_text))
+
+
+def question_numbers(questions):
+    """Номера всех вопросов, разобранные один раз: массив, параллельный questions"""
+    return array('i', (min(extract_question_number(question), MAX_QUESTION_NUMBER)
+                       for question in questions))
+
+
+class Distribution:
+    """Результат распределения: для каждого человека массив индексов вопросов.
+
+    Массивы индексов (array('i')) хранятся уже отсортированными по номеру
+    вопроса, поэтому таблица и экспорт выводят их как есть, без повторного
+    разбора текста. Сам текст из распределения не копируется. mode, units
+    и limits - как распределение получено (их заполняет split_by_mode);
+    по ним решается, можно ли перераспределить только изменения (rebalance).
+    """
+
+    __slots__ = ('questions', 'persons', 'indices', 'numbers', 'mode', 'units', 'limits')
+
+    def __init__(self, questions, persons, indices, numbers=None, presorted=False):
+        if numbers is None:
+            numbers = question_numbers(questions)
+        self.questions = questions
+        self.persons = list(persons)
+        self.numbers = numbers
+        self.mode = None
+        self.units = None
+        self.limits = None
+        if presorted:
+            self.indices = indices
+        else:
+            # sorted() устойчив: вопросы без номера и с одинаковым номером
+            # остаются в порядке распределения
+            self.indices = [array('i', sorted(idx, key=numbers.__getitem__)) for idx in indices]
+
+    def __len__(self):
+        return len(self.persons)
+
+    def counts(self):
+        return [len(idx) for idx in self.indices]
+
+    def total(self):
+        return sum(self.counts())
+
+    def questions_for(self, position):
+        """Вопросы человека; строки декодируются только при обращении"""
+        return QuestionView(self.questions, self.indices[position])
+
+    def items(self):
+        for position, person in enumerate(self.persons):
+            yield person, self.questions_for(position)
+
+    def as_dict(self):
+        """Словарь {человек: QuestionView} в формате persons_distribution"""
+        return dict(self.items())
+
+
+def _check_persons(persons):
+    if not persons:
+        raise ValueError('Список людей пуст')
+
+
+def split_even(questions, persons, numbers=None):
+    """Равномерное распределение по порядку следования вопросов"""
+    _check_persons(persons)
+
+    num_persons = len(persons)
+    for_one_person = len(questions) // num_persons
+    remainder = len(questions) % num_persons
+
+    indices = [
+        list(range(for_one_person * i, for_one_person * (i + 1)))
+        for i in range(num_persons)
+    ]
+
+    if remainder > 0:
+        start_remainder = for_one_person * num_persons
+        for i in range(remainder):
+            indices[i % num_persons].append(start_remainder + i)
+
+    return Distribution(questions, persons, indices, numbers)
+
+
+def split_random(questions, persons, seed=None, numbers=None):
+    """Случайное распределение; одинаковый seed даёт одинаковый результат"""
+    _check_persons(persons)
+
+    rng = random.Random(seed)
+    order = array('i', range(len(questions)))
+    rng.shuffle(order)
+
+    # Выбор «наименее загруженного» для каждого вопроса по очереди даёт
+    # ровно круговой обход перемешанного списка, поэтому берём срезы с шагом:
+    # O(Q) вместо O(Q*P), разница в количестве вопросов не больше 1.
+    num_persons = len(persons)
+    indices = [order[position::num_persons] for position in range(num_persons)]
+
+    return Distribution(questions, persons, indices, numbers)
+
+
+def allocate_counts(total, weights, min_counts=None, max_counts=None):
+    """Делит total вопросов пропорционально весам с учётом границ min/max.
+
+    Доля каждого - weight * k, зажатая в [min, max], где k подбирается так,
+    чтобы сумма долей была равна total. Целые количества получаются методом
+    наибольших остатков: все получают целую часть доли, оставшиеся вопросы
+    уходят людям с наибольшей дробной частью. max=None - без ограничения.
+    """
+    num_persons = len(weights)
+    mins = list(min_counts) if min_counts is not None else [0] * num_persons
+    if max_counts is None:
+        maxs = [total] * num_persons
+    else:
+        maxs = [total if m is None else m for m in max_counts]
+
+    if len(mins) != num_persons or len(maxs) != num_persons:
+        raise ValueError('Количество весов и границ не совпадает с количеством людей')
+    if any(w < 0 for w in weights):
+        raise ValueError('Вес не может быть отрицательным')
+    if any(lo < 0 or lo > hi for lo, hi in zip(mins, maxs)):
+        raise ValueError('Минимум должен быть от 0 до максимума')
+    if sum(mins) > total:
+        raise ValueError(f'Сумма минимумов ({sum(mins)}) больше количества вопросов ({total})')
+    reachable = sum(hi if w > 0 else lo for w, lo, hi in zip(weights, mins, maxs))
+    if reachable < total:
+        raise ValueError(f'Можно распределить не больше {reachable} вопросов из {total}: '
+                         f'увеличьте максимумы или веса')
+
+    def quotas(k):
+        return [min(max(k * w, lo), hi) for w, lo, hi in zip(weights, mins, maxs)]
+
+    if sum(mins) == total:
+        shares = [float(lo) for lo in mins]
+    else:
+        # Сумма долей монотонно растёт с k: ищем k делением пополам
+        low, high = 0.0, total / max(sum(weights), 1e-12)
+        while sum(quotas(high)) < total:
+            high *= 2
+        for _ in range(64):
+            middle = (low + high) / 2
+            if sum(quotas(middle)) < total:
+                low = middle
+            else:
+                high = middle
+        shares = quotas(high)
+
+    counts = [int(share) for share in shares]
+    leftover = total - sum(counts)
+    by_remainder = sorted(range(num_persons), key=lambda i: shares[i] - counts[i], reverse=True)
+    while leftover > 0:
+        for i in by_remainder:
+            if counts[i] < maxs[i]:
+                counts[i] += 1
+                leftover -= 1
+                if not leftover:
+                    break
+    return counts
+
+
+def split_weighted(questions, persons, weights=None, min_counts=None, max_counts=None,
+                   seed=None, numbers=None, sizes=None):
+    """Распределение по весам и границам количества вопросов на человека.
+
+    Количества считает allocate_counts, вопросы раздаются подряд одним
+    проходом; если задан seed, вопросы предварительно перемешиваются.
+    sizes - сколько вопросов в каждом элементе questions (группы повторов):
+    тогда границы считаются в вопросах, а элементы раздаёт _assign_sized.
+    """
+    _check_persons(persons)
+    if weights is None:
+        weights = [1] * len(persons)
+
+    if seed is None:
+        order = range(len(questions))
+    else:
+        order = list(range(len(questions)))
+        random.Random(seed).shuffle(order)
+
+    if sizes is not None:
+        counts = allocate_counts(sum(sizes), weights, min_counts, max_counts)
+        indices = _assign_sized(order, sizes, counts, min_counts, max_counts)
+        return Distribution(questions, persons, indices, numbers)
+
+    counts = allocate_counts(len(questions), weights, min_counts, max_counts)
+
+    indices = []
+    start = 0
+    for count in counts:
+        indices.append(list(order[start:start + count]))
+        start += count
+
+    return Distribution(questions, persons, indices, numbers)
+
+
+def _assign_sized(order, sizes, targets, min_counts=None, max_counts=None):
+    """Раздаёт элементы разного размера, не превышая максимумы.
+
+    Элементы от большего к меньшему (при равном размере - в порядке order)
+    достаются человеку, которому до своей доли targets не хватает больше
+    всего и у которого хватает места до максимума (куча, O(N log P)).
+    Если элемент никому не помещается или минимум не набран, ValueError.
+    """
+    num_persons = len(targets)
+    maxs = [None] * num_persons if max_counts is None else list(max_counts)
+    loads = [0] * num_persons
+    indices = [[] for _ in targets]
+    heap = [(-target, position) for position, target in enumerate(targets)]
+    heapq.heapify(heap)
+
+    for item in sorted(order, key=lambda i: -sizes[i]):
+        size = sizes[item]
+        skipped = []
+        while heap:
+            entry = heapq.heappop(heap)
+            position = entry[1]
+            if maxs[position] is None or loads[position] + size <= maxs[position]:
+                break
+            # Элементы идут по убыванию размера: полному месту больше ничего не достанется
+            if maxs[position] > loads[position]:
+                skipped.append(entry)
+        else:
+            raise ValueError(f'Группу из {size} вопросов некому отдать без превышения '
+                             f'максимума: увеличьте максимумы')
+        indices[position].append(item)
+        loads[position] += size
+        heapq.heappush(heap, (loads[position] - targets[position], position))
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+
+    if min_counts is not None:
+        for position, minimum in enumerate(min_counts):
+            if loads[position] < minimum:
+                raise ValueError(f'Группы повторов не удаётся разделить так, чтобы у каждого '
+                                 f'был минимум: у человека {position + 1} {loads[position]} '
+                                 f'из {minimum}')
+    return indices
+
+
+def split_by_cost(questions, persons, costs=None, refine=True, numbers=None):
+    """Распределение, выравнивающее суммарную сложность вопросов у людей.
+
+    Жадный алгоритм LPT: вопросы от самого сложного к самому простому
+    отдаются наименее загруженному (куча по нагрузке, O(Q log P)). Затем,
+    если refine, вопросы переносятся от самого загруженного к наименее
+    загруженному, пока это уменьшает максимальную нагрузку.
+    """
+    _check_persons(persons)
+    if costs is None:
+        costs = [question_cost(question) for question in questions]
+
+    num_persons = len(persons)
+    indices = [[] for _ in persons]
+    loads = [0.0] * num_persons
+    heap = [(0.0, position) for position in range(num_persons)]
+
+    for question_index in sorted(range(len(questions)), key=costs.__getitem__, reverse=True):
+        load, position = heapq.heappop(heap)
+        indices[position].append(question_index)
+        load += costs[question_index]
+        loads[position] = load
+        heapq.heappush(heap, (load, position))
+
+    if refine and num_persons > 1:
+        _refine_by_moves(indices, loads, costs)
+
+    return Distribution(questions, persons, indices, numbers)
+
+
+def _refine_by_moves(indices, loads, costs, max_moves=1000):
+    """Локальный поиск: перенос одного вопроса с максимума на минимум.
+
+    Перенос вопроса стоимостью c уменьшает максимум, если c < разницы
+    нагрузок; лучше всего c, ближайшая к половине разницы.
+    """
+    for _ in range(max_moves):
+        heaviest = max(range(len(loads)), key=loads.__getitem__)
+        lightest = min(range(len(loads)), key=loads.__getitem__)
+        gap = loads[heaviest] - loads[lightest]
+
+        best = None
+        best_slot = None
+        for slot, question_index in enumerate(indices[heaviest]):
+            cost = costs[question_index]
+            if 0 < cost < gap and (best is None or abs(gap / 2 - cost) < abs(gap / 2 - best)):
+                best = cost
+                best_slot = slot
+        if best_slot is None:
+            break
+
+        question_index = indices[heaviest][best_slot]
+        indices[heaviest][best_slot] = indices[heaviest][-1]
+        indices[heaviest].pop()
+        indices[lightest].append(question_index)
+        loads[heaviest] -= best
+        loads[lightest] += best
+
+
+SPLIT_MODES = ('even', 'random', 'cost', 'weighted')
+
+
+def split_by_mode(mode, questions, persons, seed=None, limits=None, numbers=None, units=None):
+    """Распределение выбранным способом.
+
+    limits - (веса, минимумы, максимумы) для режима 'weighted'.
+    units - единицы распределения (списки индексов вопросов, например группы
+    повторов из dedup.question_units): каждая единица целиком достаётся
+    одному человеку. Режимы 'even' и 'random' считают её одним вопросом,
+    'weighted' соблюдает границы по числу вопросов в единицах, 'cost'
+    берёт сумму сложностей её вопросов.
+    """
+    distribution = _split_by_mode(mode, questions, persons, seed, limits, numbers, units)
+    distribution.mode = mode
+    distribution.units = units
+    distribution.limits = limits
+    return distribution
+
+
+def _split_by_mode(mode, questions, persons, seed, limits, numbers, units):
+    if units is not None:
+        unit_questions = [questions[unit[0]] for unit in units]
+        unit_numbers = None
+        if numbers is not None:
+            unit_numbers = array(numbers.typecode, (numbers[unit[0]] for unit in units))
+        if mode == 'cost':
+            costs = [sum(question_cost(questions[index]) for index in unit) for unit in units]
+            by_units = split_by_cost(unit_questions, persons, costs, numbers=unit_numbers)
+        elif mode == 'weighted':
+            weights, min_counts, max_counts = limits
+            by_units = split_weighted(unit_questions, persons, weights, min_counts, max_counts,
+                                      seed, unit_numbers, [len(unit) for unit in units])
+        else:
+            by_units = _split_by_mode(mode, unit_questions, persons, seed, limits, unit_numbers,
+                                      None)
+        indices = [[index for unit in unit_indices for index in units[unit]]
+                   for unit_indices in by_units.indices]
+        return Distribution(questions, persons, indices, numbers)
+
+    if mode == 'random':
+        return split_random(questions, persons, seed, numbers)
+    if mode == 'cost':
+        return split_by_cost(questions, persons, numbers=numbers)
+    if mode == 'weighted':
+        weights, min_counts, max_counts = limits
+        return split_weighted(questions, persons, weights, min_counts, max_counts, seed, numbers)
+    if mode == 'even':
+        return split_even(questions, persons, numbers)
+    raise ValueError(f'Неизвестный режим распределения: {mode}')
+
+
+def _insert_sorted(indices, question_index, numbers):
+    """Вставляет индекс в список, отсортированный по номеру (после равных)"""
+    number = numbers[question_index]
+    lo, hi = 0, len(indices)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if numbers[indices[mid]] <= number:
+            lo = mid + 1
+        else:
+            hi = mid
+    indices.insert(lo, question_index)
+
+
+# Режимы, которые только выравнивают количество вопросов: для них
+# перераспределение изменений сохраняет смысл распределения
+REBALANCE_MODES = ('even', 'random')
+
+
+def can_rebalance(distribution):
+    """Можно ли перераспределить только изменения (rebalance).
+
+    Веса и границы, баланс сложности и группы повторов rebalance не
+    учитывает, такие распределения нужно строить заново.
+    """
+    return distribution.mode in REBALANCE_MODES and distribution.units is None
+
+
+def rebalance(distribution, persons):
+    """Перераспределяет только то, что нужно после изменения списка людей.
+
+    Вопросы ушедших людей раздаются оставшимся, новички забирают вопросы
+    у самых загруженных; остальные назначения не меняются. Работа
+    пропорциональна числу перемещённых вопросов, а не общему их количеству.
+    Годится только для распределений, где can_rebalance истинно, иначе
+    ValueError. Возвращает (новое распределение, количество перемещённых
+    вопросов).
+    """
+    _check_persons(persons)
+    if not can_rebalance(distribution):
+        raise ValueError('Перераспределить только изменения можно для равномерного или '
+                         'случайного распределения без групп повторов')
+
+    # Списки индексов общие со старым распределением, пока их не нужно менять
+    old_positions = {person: position for position, person in enumerate(distribution.persons)}
+    new_indices = []
+    pool = []
+    for person in persons:
+        position = old_positions.pop(person, None)
+        new_indices.append(distribution.indices[position] if position is not None
+                           else array('i'))
+    for position in old_positions.values():
+        pool.extend(distribution.indices[position])
+
+    # Лишний вопрос при неравном делении достаётся самым загруженным сейчас,
+    # тогда у них ничего не придётся забирать
+    total = sum(len(idx) for idx in new_indices) + len(pool)
+    base, remainder = divmod(total, len(persons))
+    by_load = sorted(range(len(persons)), key=lambda p: len(new_indices[p]), reverse=True)
+    targets = [base] * len(persons)
+    for position in by_load[:remainder]:
+        targets[position] += 1
+
+    moved = len(pool)
+    for position, indices in enumerate(new_indices):
+        extra = len(indices) - targets[position]
+        if extra > 0:
+            pool.extend(indices[-extra:])
+            new_indices[position] = indices[:-extra]
+            moved += extra
+
+    numbers = distribution.numbers
+    for position, indices in enumerate(new_indices):
+        missing = targets[position] - len(indices)
+        if missing > 0:
+            indices = new_indices[position] = array('i', indices)
+            for _ in range(missing):
+                _insert_sorted(indices, pool.pop(), numbers)
+
+    result = Distribution(distribution.questions, persons, new_indices, numbers, presorted=True)
+    result.mode = distribution.mode
+    return result, moved
@@ -0,0 +1,186 @@
+"""Воспроизводимые распределения и компактные записи о них без зависимости от PyQt5.
+
+Случайность распределения выводится только из seed, хэша набора вопросов
+и списка людей (derive_seed), поэтому одинаковые входные данные дают одно
+и то же распределение на любой машине. Запись о распределении (SplitRecord)
+хранит эти параметры, а если распределение по ним не повторить (после
+перераспределения или с группами повторов) - ещё и упакованный массив
+назначений. По записи и загруженным вопросам распределение
+восстанавливается без разбора экспортированных документов.
+"""
+import base64
+import hashlib
+import json
+import sys
+import zlib
+from array import array
+
+import split_engine
+from question_store import QuestionStore
+
+
+RECORD_FORMAT = 'question-splitter-record'
+RECORD_VERSION = 1
+RECORD_SUFFIX = '.qsplit'
+
+
+def questions_hash(questions):
+    """SHA-256 набора вопросов: одинаков для списка строк и QuestionStore"""
+    if not isinstance(questions, QuestionStore):
+        questions = QuestionStore.from_questions(questions)
+    offsets = questions.offsets
+    if sys.byteorder == 'big':
+        offsets = array(offsets.typecode, offsets)
+        offsets.byteswap()
+    digest = hashlib.sha256()
+    digest.update(offsets.tobytes())
+    digest.update(questions.buffer)
+    return digest.hexdigest()
+
+
+def derive_seed(seed, question_set_hash, persons):
+    """Seed генератора, зависящий только от seed, набора вопросов и списка людей"""
+    if seed is None:
+        return None
+    digest = hashlib.sha256()
+    digest.update(f'{seed}\n{question_set_hash}\n'.encode('utf-8'))
+    for person in persons:
+        digest.update(person.encode('utf-8') + b'\n')
+    return int.from_bytes(digest.digest()[:8], 'little')
+
+
+def _assignment_typecode(num_persons):
+    for typecode in ('B', 'H', 'I'):
+        if num_persons <= 1 << (8 * array(typecode).itemsize):
+            return typecode
+    return 'Q'
+
+
+def pack_assignment(distribution):
+    """Номер человека для каждого вопроса: массив минимальной ширины, сжатый zlib"""
+    typecode = _assignment_typecode(len(distribution.persons))
+    assignment = array(typecode, bytes(array(typecode).itemsize * len(distribution.questions)))
+    for position, indices in enumerate(distribution.indices):
+        for index in indices:
+            assignment[index] = position
+    if sys.byteorder == 'big':
+        assignment.byteswap()
+    return typecode, zlib.compress(assignment.tobytes(), 9)
+
+
+def unpack_assignment(typecode, data, num_persons):
+    """Списки индексов по людям из упакованного массива назначений"""
+    assignment = array(typecode)
+    assignment.frombytes(zlib.decompress(data))
+    if sys.byteorder == 'big':
+        assignment.byteswap()
+
+    indices = [array('i') for _ in range(num_persons)]
+    for index, position in enumerate(assignment):
+        indices[position].append(index)
+    return indices
+
+
+class SplitRecord:
+    """Параметры распределения и, при необходимости, упакованные назначения"""
+
+    __slots__ = ('mode', 'seed', 'questions_hash', 'question_count', 'persons', 'limits',
+                 'assignment')
+
+    def __init__(self, mode, seed, questions_hash, question_count, persons, limits=None,
+                 assignment=None):
+        self.mode = mode
+        self.seed = seed
+        self.questions_hash = questions_hash
+        self.question_count = question_count
+        self.persons = list(persons)
+        self.limits = limits
+        self.assignment = assignment
+
+    @classmethod
+    def from_distribution(cls, distribution, question_set_hash, mode='rebalance', seed=None,
+                          limits=None):
+        """Запись с упакованными назначениями: восстанавливается любое распределение"""
+        return cls(mode, seed, question_set_hash, len(distribution.questions),
+                   distribution.persons, limits, pack_assignment(distribution))
+
+    def rebuild(self, questions, numbers=None, question_set_hash=None):
+        """Восстанавливает распределение для тех же вопросов, что и при записи"""
+        if question_set_hash is None:
+            question_set_hash = questions_hash(questions)
+        if question_set_hash != self.questions_hash or len(questions) != self.question_count:
+            raise ValueError('Запись сделана для другого набора вопросов')
+
+        if self.assignment is not None:
+            typecode, data = self.assignment
+            indices = unpack_assignment(typecode, data, len(self.persons))
+            return split_engine.Distribution(questions, self.persons, indices, numbers)
+
+        seed = derive_seed(self.seed, self.questions_hash, self.persons)
+        return split_engine.split_by_mode(self.mode, questions, self.persons, seed, self.limits,
+                                          numbers)
+
+    def to_json(self):
+        data = {
+            'format': RECORD_FORMAT,
+            'version': RECORD_VERSION,
+            'mode': self.mode,
+            'seed': self.seed,
+            'questions_hash': self.questions_hash,
+            'question_count': self.question_count,
+            'persons': self.persons,
+            'limits': self.limits,
+            'assignment': None,
+        }
+        if self.assignment is not None:
+            typecode, packed = self.assignment
+            data['assignment'] = {'typecode': typecode,
+                                  'data': base64.b64encode(packed).decode('ascii')}
+        return data
+
+    @classmethod
+    def from_json(cls, data):
+        if data.get('format') != RECORD_FORMAT or data.get('version') != RECORD_VERSION:
+            raise ValueError('Файл не является записью распределения')
+        assignment = data.get('assignment')
+        if assignment is not None:
+            assignment = (assignment['typecode'], base64.b64decode(assignment['data']))
+        return cls(data['mode'], data['seed'], data['questions_hash'], data['question_count'],
+                   data['persons'], data.get('limits'), assignment)
+
+    def save(self, file_path):
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_json(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, file_path):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError:
+                raise ValueError('Файл не является записью распределения')
+        return cls.from_json(data)
+
+
+def split_reproducible(mode, questions, persons, seed=None, limits=None, numbers=None,
+                       units=None, question_set_hash=None):
+    """split_engine.split_by_mode с seed, выведенным через derive_seed.
+
+    Возвращает (распределение, SplitRecord). Распределение с единицами
+    (группами повторов) записывается упакованными назначениями, чтобы для
+    восстановления не искать повторы заново; так же записывается случайное
+    распределение без seed, которое по параметрам не повторить.
+    """
+    if question_set_hash is None:
+        question_set_hash = questions_hash(questions)
+    derived = derive_seed(seed, question_set_hash, persons)
+    distribution = split_engine.split_by_mode(mode, questions, persons, derived, limits, numbers,
+                                              units)
+    if limits is not None:
+        limits = [list(values) if values is not None else None for values in limits]
+
+    if units is not None or (mode == 'random' and seed is None):
+        record = SplitRecord.from_distribution(distribution, question_set_hash, mode, seed, limits)
+    else:
+        record = SplitRecord(mode, seed, question_set_hash, len(questions), persons, limits)
+    return distribution, record
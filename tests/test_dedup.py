@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+import unittest
+
+import dedup
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CLUSTERS_SCRIPT = '''
+import random
+import dedup
+rng = random.Random(5)
+words = ["".join(rng.choice("абвгдежзиклмнопрст") for _ in range(rng.randint(3, 9)))
+         for _ in range(3000)]
+questions = [f"{i}. " + " ".join(rng.choice(words) for _ in range(8)) for i in range(5000)]
+questions += [question + " " + rng.choice(words) for question in questions[:1000]]
+print(dedup.find_duplicate_clusters(questions))
+'''
+
+
+class FindDuplicateClustersTest(unittest.TestCase):
+
+    def test_groups_do_not_depend_on_hash_seed(self):
+        outputs = set()
+        for hash_seed in ('1', '2', '3'):
+            env = dict(os.environ, PYTHONHASHSEED=hash_seed, PYTHONPATH=ROOT)
+            outputs.add(subprocess.run([sys.executable, '-c', CLUSTERS_SCRIPT], env=env,
+                                       capture_output=True, text=True, check=True).stdout)
+        self.assertEqual(len(outputs), 1)
+
+    def test_near_duplicates_are_grouped(self):
+        questions = ['1. Назовите основные свойства металлов',
+                     '2. Назовите основные свойства металлов.',
+                     '3. Назовите основные свойства неметаллов',
+                     '4. Теорема 1', '5. Теорема 2']
+        self.assertEqual(dedup.find_duplicate_clusters(questions), [[0, 1]])
+
+    def test_questions_without_words_are_not_duplicates(self):
+        questions = ['1. Первый вопрос', '2. Второй вопрос', '3. ∑ ∏', '4. ---']
+        self.assertEqual(dedup.find_duplicate_clusters(questions), [])
+
+
+    def test_progress_exception_stops_search(self):
+        def progress(done, total):
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            dedup.find_duplicate_clusters(['1. Вопрос', '2. Вопрос'], progress=progress)
+
+
+if __name__ == '__main__':
+    unittest.main()
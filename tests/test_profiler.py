@@ -0,0 +1,25 @@
+import unittest
+
+from profiler import StageProfiler
+
+
+class StageProfilerTest(unittest.TestCase):
+
+    def test_nested_stage_keeps_outer_peak(self):
+        profiler = StageProfiler(enabled=True)
+        try:
+            with profiler.stage('outer'):
+                data = bytearray(8 * 1024 * 1024)
+                del data
+                with profiler.stage('inner'):
+                    pass
+        finally:
+            profiler.set_enabled(False)
+
+        peaks = {row[0]: row[4] for row in profiler.summary()}
+        self.assertGreaterEqual(peaks['outer'], 8 * 1024 * 1024)
+        self.assertLess(peaks['inner'], 1024 * 1024)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import shutil
+import tempfile
+import unittest
+
+import question_cache
+import split_record
+
+
+class DuplicatesCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = question_cache.QuestionCache(self.cache_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_clusters_round_trip(self):
+        clusters = [[0, 3], [1, 5, 7]]
+        data = question_cache.encode_clusters(clusters)
+        self.assertEqual(question_cache.decode_clusters(data), clusters)
+
+    def test_second_search_comes_from_cache(self):
+        questions = ['1. Первый вопрос', '2. Второй вопрос', '3. Первый вопрос']
+        question_set_hash = split_record.questions_hash(questions)
+
+        clusters, cache_hit = question_cache.find_duplicates_cached(
+            questions, question_set_hash, cache=self.cache)
+        self.assertEqual((clusters, cache_hit), ([[0, 2]], False))
+
+        clusters, cache_hit = question_cache.find_duplicates_cached(
+            questions, question_set_hash, cache=self.cache)
+        self.assertEqual((clusters, cache_hit), ([[0, 2]], True))
+
+
+if __name__ == '__main__':
+    unittest.main()
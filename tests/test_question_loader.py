@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+import question_loader
+
+
+class SegmentQuestionsTest(unittest.TestCase):
+
+    def segment(self, lines):
+        return list(question_loader.segment_questions(lines))
+
+    def test_options_and_sub_items_stay_in_question(self):
+        lines = ['1. First', 'a) one', '1) sub', '2. Second', 'b) two']
+        self.assertEqual(self.segment(lines),
+                         ['1. First\na) one\n1) sub', '2. Second\nb) two'])
+
+    def test_header_does_not_set_delimiter(self):
+        lines = ['2023-2024 учебный год', '1. First', 'a) one', '2. Second', '3. Third']
+        self.assertEqual(self.segment(lines),
+                         ['2023-2024 учебный год', '1. First\na) one', '2. Second', '3. Third'])
+
+    def test_numbered_header_is_replaced_by_first_question(self):
+        lines = ['3) Общие положения', '1. First', '1) sub', '2. Second']
+        self.assertEqual(self.segment(lines),
+                         ['3) Общие положения', '1. First\n1) sub', '2. Second'])
+
+    def test_decimal_is_not_question_number(self):
+        lines = ['1. Сколько воды?', '1.5 литра', '2. Next']
+        self.assertEqual(self.segment(lines), ['1. Сколько воды?\n1.5 литра', '2. Next'])
+
+    def test_unnumbered_lines_are_separate_questions(self):
+        self.assertEqual(self.segment(['one', 'two']), ['one', 'two'])
+
+
+class LoadTxtFileTest(unittest.TestCase):
+
+    def load(self, data):
+        fd, path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        try:
+            return question_loader.load_txt_file(path)
+        finally:
+            os.remove(path)
+
+    def test_utf8_bom_is_stripped(self):
+        data = '\ufeff1. First\na) opt\n2. Second\n'.encode('utf-8')
+        self.assertEqual(self.load(data), ['1. First\na) opt', '2. Second'])
+
+    def test_header_before_questions(self):
+        data = '2023-2024 учебный год\n1. First\n2. Second\n3. Third\n'.encode('utf-8')
+        self.assertEqual(self.load(data),
+                         ['2023-2024 учебный год', '1. First', '2. Second', '3. Third'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import unittest
+
+import split_engine
+
+
+def make_questions(count):
+    return [f'{i}. Вопрос {i}' for i in range(1, count + 1)]
+
+
+def assigned(distribution):
+    return {person: set(indices)
+            for person, indices in zip(distribution.persons, distribution.indices)}
+
+
+class QuestionCostTest(unittest.TestCase):
+
+    def test_tag_on_single_line(self):
+        self.assertEqual(split_engine.question_cost('1. Вопрос {2,5}'), 2.5)
+
+    def test_tag_on_first_line_of_multi_line_question(self):
+        self.assertEqual(split_engine.question_cost('1. Q {5}\na) x\nb) y'), 5.0)
+
+    def test_tag_on_option_is_not_question_cost(self):
+        question = '1. Q\na) x\nb) y {7}'
+        self.assertEqual(split_engine.question_cost(question), float(len(question)))
+
+
+class AllocateCountsTest(unittest.TestCase):
+
+    def test_counts_sum_to_total(self):
+        for total in (0, 1, 7, 100, 1001):
+            counts = split_engine.allocate_counts(total, [1, 2, 3.5, 0.25])
+            self.assertEqual(sum(counts), total)
+
+    def test_proportional_to_weights(self):
+        self.assertEqual(split_engine.allocate_counts(30, [1, 2]), [10, 20])
+
+    def test_min_and_max_respected(self):
+        mins = [5, 0, 0]
+        maxs = [None, 3, 10]
+        counts = split_engine.allocate_counts(40, [0.1, 5, 1], mins, maxs)
+        self.assertEqual(sum(counts), 40)
+        self.assertGreaterEqual(counts[0], 5)
+        self.assertLessEqual(counts[1], 3)
+        self.assertLessEqual(counts[2], 10)
+
+    def test_zero_weight_gets_only_minimum(self):
+        self.assertEqual(split_engine.allocate_counts(20, [0, 1], [4, 0]), [4, 16])
+
+    def test_unreachable_total(self):
+        with self.assertRaises(ValueError):
+            split_engine.allocate_counts(20, [1, 1], max_counts=[5, 10])
+        with self.assertRaises(ValueError):
+            split_engine.allocate_counts(20, [0, 1], max_counts=[None, 10])
+
+    def test_minimums_over_total(self):
+        with self.assertRaises(ValueError):
+            split_engine.allocate_counts(5, [1, 1], [3, 3])
+
+
+class SizedUnitsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.questions = make_questions(30)
+        # Группа из 10 вопросов и 20 одиночных
+        self.units = [list(range(10))] + [[index] for index in range(10, 30)]
+
+    def split(self, min_counts, max_counts, units=None):
+        return split_engine.split_by_mode('weighted', self.questions, ['a', 'b'],
+                                          limits=([1, 1], min_counts, max_counts),
+                                          units=units or self.units)
+
+    def test_group_stays_with_one_person_within_max(self):
+        distribution = self.split([0, 0], [20, 20])
+        self.assertEqual(distribution.counts(), [15, 15])
+        group = set(range(10))
+        self.assertTrue(any(group <= set(indices) for indices in distribution.indices))
+
+    def test_max_is_not_exceeded(self):
+        distribution = self.split([0, 0], [5, None])
+        self.assertEqual(distribution.counts(), [5, 25])
+
+    def test_group_over_every_max_raises(self):
+        units = [list(range(16))] + [[index] for index in range(16, 30)]
+        with self.assertRaises(ValueError):
+            self.split([0, 0], [15, 15], units)
+
+    def test_unreachable_minimum_raises(self):
+        # Группа из 24 вопросов целиком у одного, второму остаётся 6 из 10
+        units = [list(range(24))] + [[index] for index in range(24, 30)]
+        with self.assertRaises(ValueError):
+            self.split([10, 10], [None, None], units)
+
+
+class RebalanceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.questions = make_questions(30)
+        self.distribution = split_engine.split_by_mode('random', self.questions,
+                                                       ['a', 'b', 'c'], seed=1)
+
+    def check_complete(self, distribution):
+        indices = sorted(index for person_indices in distribution.indices
+                         for index in person_indices)
+        self.assertEqual(indices, list(range(len(self.questions))))
+
+    def test_leave(self):
+        before = assigned(self.distribution)
+        result, moved = split_engine.rebalance(self.distribution, ['a', 'c'])
+        after = assigned(result)
+
+        self.check_complete(result)
+        self.assertEqual(moved, 10)
+        self.assertEqual(result.counts(), [15, 15])
+        self.assertLessEqual(before['a'], after['a'])
+        self.assertLessEqual(before['c'], after['c'])
+
+    def test_join(self):
+        before = assigned(self.distribution)
+        result, moved = split_engine.rebalance(self.distribution, ['a', 'b', 'c', 'd'])
+        after = assigned(result)
+
+        self.check_complete(result)
+        self.assertEqual(moved, len(after['d']))
+        self.assertEqual(sorted(result.counts()), [7, 7, 8, 8])
+        for person in 'abc':
+            self.assertLessEqual(after[person], before[person])
+
+    def test_rename(self):
+        before = assigned(self.distribution)
+        result, moved = split_engine.rebalance(self.distribution, ['a', 'bb', 'c'])
+        after = assigned(result)
+
+        self.assertEqual(moved, 10)
+        self.assertEqual(after['bb'], before['b'])
+        self.assertEqual(after['a'], before['a'])
+        self.assertEqual(after['c'], before['c'])
+
+    def test_result_can_be_rebalanced_again(self):
+        result, _ = split_engine.rebalance(self.distribution, ['a', 'b'])
+        self.assertTrue(split_engine.can_rebalance(result))
+
+    def test_limited_splits_are_not_rebalanced(self):
+        units = [[0, 1, 2, 3, 4, 5]] + [[index] for index in range(6, 30)]
+        splits = [
+            split_engine.split_by_mode('even', self.questions, ['a', 'b'], units=units),
+            split_engine.split_by_mode('cost', self.questions, ['a', 'b']),
+            split_engine.split_by_mode('weighted', self.questions, ['a', 'b'],
+                                       limits=([1, 1], [0, 0], [None, 5])),
+        ]
+        for distribution in splits:
+            self.assertFalse(split_engine.can_rebalance(distribution))
+            with self.assertRaises(ValueError):
+                split_engine.rebalance(distribution, ['a', 'b', 'c'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import split_engine
+import split_record
+from question_store import QuestionStore
+
+
+class SplitRecordTest(unittest.TestCase):
+
+    def setUp(self):
+        self.questions = QuestionStore.from_questions(f'{i}. Вопрос {i}' for i in range(1, 101))
+        self.persons = ['Анна', 'Борис', 'Вера']
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'split' + split_record.RECORD_SUFFIX)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def round_trip(self, record):
+        record.save(self.path)
+        return split_record.SplitRecord.load(self.path)
+
+    def assert_same_split(self, a, b):
+        self.assertEqual(a.persons, b.persons)
+        self.assertEqual([list(indices) for indices in a.indices],
+                         [list(indices) for indices in b.indices])
+
+    def test_seeded_record_rebuilds_same_split(self):
+        distribution, record = split_record.split_reproducible(
+            'random', self.questions, self.persons, seed=42)
+        self.assertIsNone(record.assignment)
+
+        rebuilt = self.round_trip(record).rebuild(self.questions)
+        self.assert_same_split(distribution, rebuilt)
+
+    def test_same_seed_same_split(self):
+        first, _ = split_record.split_reproducible('random', self.questions, self.persons, seed=7)
+        second, _ = split_record.split_reproducible('random', list(self.questions), self.persons,
+                                                    seed=7)
+        self.assert_same_split(first, second)
+
+    def test_packed_assignment_after_rebalance(self):
+        distribution, _ = split_record.split_reproducible(
+            'random', self.questions, self.persons, seed=1)
+        rebalanced, _ = split_engine.rebalance(distribution, ['Анна', 'Вера', 'Глеб', 'Дина'])
+        record = split_record.SplitRecord.from_distribution(
+            rebalanced, split_record.questions_hash(self.questions))
+        self.assertIsNotNone(record.assignment)
+
+        rebuilt = self.round_trip(record).rebuild(self.questions)
+        self.assert_same_split(rebalanced, rebuilt)
+
+    def test_record_for_other_questions_is_rejected(self):
+        _, record = split_record.split_reproducible('even', self.questions, self.persons)
+        other = QuestionStore.from_questions(f'{i}. Другой вопрос {i}' for i in range(1, 101))
+        with self.assertRaises(ValueError):
+            self.round_trip(record).rebuild(other)
+
+    def test_other_file_is_not_a_record(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('1. Вопрос')
+        with self.assertRaises(ValueError):
+            split_record.SplitRecord.load(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,14 @@
+import unittest
+
+import benchmark
+
+
+class StartupBudgetTest(unittest.TestCase):
+
+    def test_startup_within_budget(self):
+        results, ok = benchmark.check_startup(runs=3)
+        self.assertTrue(ok, results)
+
+
+if __name__ == '__main__':
+    unittest.main()
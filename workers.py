@@ -0,0 +1,150 @@
+"""Фоновое выполнение загрузки, распределения и сохранения через QThreadPool.
+
+Функции задач выполняются в потоке пула и не трогают виджеты: прогресс,
+результат, ошибка и отмена передаются в окно сигналами Qt.
+"""
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+import dedup
+import question_cache
+import question_store
+import result_export
+import split_engine
+import split_record
+from profiler import PROFILER, profiled
+
+
+class TaskCancelled(Exception):
+    """Операция отменена пользователем"""
+
+
+class TaskSignals(QObject):
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class Task(QRunnable):
+    """Выполняет fn(task, *args) в потоке пула; результат приходит сигналом finished"""
+
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.signals = TaskSignals()
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def check_cancelled(self):
+        if self._cancelled:
+            raise TaskCancelled()
+
+    def set_progress(self, value):
+        """Сообщает прогресс 0-100 и заодно прерывает задачу, если её отменили"""
+        self.check_cancelled()
+        self.signals.progress.emit(int(value))
+
+    def run(self):
+        try:
+            self.check_cancelled()
+            result = self.fn(self, *self.args)
+            self.check_cancelled()
+        except TaskCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+
+@profiled('load_file')
+def load_questions_task(task, file_path):
+    def progress(bytes_read, total_bytes):
+        task.set_progress(bytes_read * 80 / total_bytes if total_bytes else 80)
+
+    with PROFILER.stage('load_file.parse'):
+        questions, cache_hit = question_cache.load_questions_cached(file_path, progress)
+    with PROFILER.stage('load_file.numbers'):
+        numbers = split_engine.question_numbers(questions)
+    with PROFILER.stage('load_file.hash'):
+        questions_hash = split_record.questions_hash(questions)
+    task.set_progress(100)
+    return questions, numbers, questions_hash, cache_hit
+
+
+@profiled('duplicates')
+def duplicates_task(task, questions, questions_hash):
+    """Группы повторов через кэш; вопросы возвращаются, чтобы окно проверило,
+    что файл не сменился"""
+    def progress(done, total):
+        task.set_progress(done * 100 / total if total else 100)
+
+    clusters, cache_hit = question_cache.find_duplicates_cached(questions, questions_hash,
+                                                                progress)
+    return questions, clusters, cache_hit
+
+
+def split_task(task, mode, questions, persons, numbers=None, limits=None, clusters=None,
+               seed=None, questions_hash=None):
+    """limits - (веса, минимумы, максимумы) для режима 'weighted';
+    clusters - группы повторов, каждая отдаётся одному человеку;
+    seed вместе с набором вопросов и людей однозначно задаёт распределение"""
+    task.set_progress(10)
+    units = dedup.question_units(len(questions), clusters) if clusters else None
+    with PROFILER.stage(f'split.{mode}'):
+        distribution, record = split_record.split_reproducible(
+            mode, questions, persons, seed, limits, numbers, units, questions_hash)
+    task.set_progress(70)
+    with PROFILER.stage('split.as_dict'):
+        persons_distribution = distribution.as_dict()
+    task.set_progress(100)
+    return distribution, persons_distribution, record
+
+
+@profiled('rebalance')
+def rebalance_task(task, distribution, persons, questions_hash):
+    task.set_progress(10)
+    distribution, moved = split_engine.rebalance(distribution, persons)
+    task.set_progress(60)
+    record = split_record.SplitRecord.from_distribution(distribution, questions_hash)
+    task.set_progress(80)
+    persons_distribution = distribution.as_dict()
+    task.set_progress(100)
+    return distribution, persons_distribution, record, moved
+
+
+@profiled('search_index')
+def search_index_task(task, questions, numbers=None):
+    """Индекс поиска для предпросмотра; вопросы возвращаются, чтобы окно
+    проверило, что файл не сменился"""
+    task.set_progress(10)
+    search_index = question_store.SearchIndex(questions, numbers)
+    task.set_progress(100)
+    return questions, search_index
+
+
+@profiled('restore_split')
+def restore_task(task, record_path, questions, numbers=None, questions_hash=None):
+    """Восстанавливает распределение по файлу записи для загруженных вопросов"""
+    task.set_progress(10)
+    record = split_record.SplitRecord.load(record_path)
+    task.set_progress(30)
+    distribution = record.rebuild(questions, numbers, questions_hash)
+    task.set_progress(80)
+    persons_distribution = distribution.as_dict()
+    task.set_progress(100)
+    return distribution, persons_distribution, record
+
+
+@profiled('save_results')
+def save_task(task, persons_distribution, file_path, numbers=None):
+    task.set_progress(10)
+    file_path = result_export.save_results(persons_distribution, file_path, numbers=numbers)
+    task.set_progress(100)
+    return file_path